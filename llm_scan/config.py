@@ -3,15 +3,19 @@
 import logging
 import os
 from dataclasses import dataclass, field
-from pathlib import Path
 from typing import List, Optional
 
 from .models import Severity
 
 logger = logging.getLogger(__name__)
 
+# Default rules directory shipped with the package (computed once at import)
+_DEFAULT_RULES_DIR = os.path.normpath(
+    os.path.join(os.path.dirname(__file__), "..", "llm_scan", "rules", "python")
+)
 
-@dataclass
+
+@dataclass(slots=True)
 class ScanConfig:
     """Configuration for a scan."""
 
@@ -26,16 +30,31 @@ class ScanConfig:
     output_file: Optional[str] = None
     respect_gitignore: bool = True
     max_target_bytes: int = 1_000_000  # 1MB per file limit
+    enable_parse_cache: bool = True  # Reuse Semgrep's parsed ASTs across runs
+    enable_finding_cache: bool = True  # Reuse matches of files unchanged since the last scan
+    jobs: Optional[int] = None  # Semgrep worker processes (None = CPU count, capped at 8)
+    sharded_scan: bool = False  # Split large scans across concurrent Semgrep processes
+    semgrep_max_memory: int = 4096  # Semgrep --max-memory, in MiB (0 = unlimited)
+    semgrep_timeout: int = 60  # Semgrep --timeout: seconds per rule and file (0 = unlimited)
+    semgrep_timeout_threshold: int = 3  # Semgrep --timeout-threshold: timeouts before skipping a file
     # AI filtering configuration
     enable_ai_filter: bool = False
     ai_provider: str = "openai"  # "openai", "anthropic", "local"
     ai_api_key: Optional[str] = None
-    ai_model: str = "gpt-4"  # Model name for the provider
+    ai_model: str = "gpt-4"  # Model name for the provider (GGUF file path for "local")
+    ai_local_model: Optional[str] = None  # GGUF model tried before the cloud provider (None = cloud only)
     ai_confidence_threshold: float = 0.7  # Only filter if confidence > threshold
     ai_batch_size: int = 10  # Process findings in batches
+    ai_max_workers: int = 4  # Maximum concurrent AI provider requests
+    ai_max_retries: int = 5  # Retries per AI request (exponential backoff, honors Retry-After)
     ai_cache_enabled: bool = True  # Cache AI responses
+    ai_cache_path: Optional[str] = None  # On-disk verdict cache (None = ~/.cache/truscan/ai_verdicts.sqlite)
+    ai_cache_ttl: Optional[int] = 7 * 24 * 60 * 60  # Seconds before an on-disk verdict expires (None = never)
+    ai_semantic_cache_threshold: Optional[float] = None  # Reuse responses for prompts this similar (None = off)
+    ai_semantic_cache_path: Optional[str] = None  # Semantic cache directory (None = ~/.cache/truscan/semantic)
     ai_analyze_rules: Optional[List[str]] = None  # Specific rules to analyze (None = all)
     ai_max_findings: Optional[int] = None  # Maximum number of findings to analyze (None = unlimited)
+    _resolved_rules_dir: Optional[str] = field(default=None, init=False, repr=False, compare=False)
 
     @classmethod
     def from_dict(cls, data: dict) -> "ScanConfig":
@@ -56,45 +75,65 @@ class ScanConfig:
             output_file=data.get("output_file"),
             respect_gitignore=data.get("respect_gitignore", True),
             max_target_bytes=data.get("max_target_bytes", 1_000_000),
+            enable_parse_cache=data.get("enable_parse_cache", True),
+            enable_finding_cache=data.get("enable_finding_cache", True),
+            jobs=data.get("jobs"),
+            sharded_scan=data.get("sharded_scan", False),
+            semgrep_max_memory=data.get("semgrep_max_memory", 4096),
+            semgrep_timeout=data.get("semgrep_timeout", 60),
+            semgrep_timeout_threshold=data.get("semgrep_timeout_threshold", 3),
             enable_ai_filter=data.get("enable_ai_filter", False),
             ai_provider=data.get("ai_provider", "openai"),
             ai_api_key=data.get("ai_api_key"),
             ai_model=data.get("ai_model", "gpt-4"),
+            ai_local_model=data.get("ai_local_model"),
             ai_confidence_threshold=data.get("ai_confidence_threshold", 0.7),
             ai_batch_size=data.get("ai_batch_size", 10),
+            ai_max_workers=data.get("ai_max_workers", 4),
+            ai_max_retries=data.get("ai_max_retries", 5),
             ai_cache_enabled=data.get("ai_cache_enabled", True),
+            ai_cache_path=data.get("ai_cache_path"),
+            ai_cache_ttl=data.get("ai_cache_ttl", 7 * 24 * 60 * 60),
+            ai_semantic_cache_threshold=data.get("ai_semantic_cache_threshold"),
+            ai_semantic_cache_path=data.get("ai_semantic_cache_path"),
             ai_analyze_rules=data.get("ai_analyze_rules"),
             ai_max_findings=data.get("ai_max_findings"),
         )
 
     def get_default_rules_dir(self) -> str:
         """Get default rules directory relative to package."""
-        package_dir = Path(__file__).parent.parent
-        return str(package_dir / "llm_scan" / "rules" / "python")
+        return _DEFAULT_RULES_DIR
 
     def resolve_rules_dir(self) -> str:
-        """Resolve rules directory path."""
+        """Resolve rules directory path (memoized after the first call)."""
+        if self._resolved_rules_dir:
+            return self._resolved_rules_dir
+
         logger.debug(f"Resolving rules directory: {self.rules_dir}")
         if os.path.isabs(self.rules_dir):
             logger.debug(f"Rules directory is absolute: {self.rules_dir}")
-            return self.rules_dir
+            self._resolved_rules_dir = self.rules_dir
+            return self._resolved_rules_dir
+        # Relative path: join with CWD once instead of calling abspath
+        relative = os.path.normpath(os.path.join(os.getcwd(), self.rules_dir))
         # Try relative to current working directory first
-        if os.path.exists(self.rules_dir):
-            resolved = os.path.abspath(self.rules_dir)
-            logger.debug(f"Found rules directory (relative to CWD): {resolved}")
-            return resolved
+        if os.path.exists(relative):
+            logger.debug(f"Found rules directory (relative to CWD): {relative}")
+            self._resolved_rules_dir = relative
+            return relative
         # Fall back to package default
         default = self.get_default_rules_dir()
         logger.debug(f"Trying default rules directory: {default}")
         if os.path.exists(default):
             logger.debug(f"Using default rules directory: {default}")
+            self._resolved_rules_dir = default
             return default
-        resolved = os.path.abspath(self.rules_dir)
-        logger.debug(f"Using resolved rules directory: {resolved}")
-        return resolved
+        logger.debug(f"Using resolved rules directory: {relative}")
+        self._resolved_rules_dir = relative
+        return relative
 
 
-@dataclass
+@dataclass(slots=True)
 class RulePack:
     """Metadata for a rule pack."""
 
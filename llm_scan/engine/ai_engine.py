@@ -3,15 +3,48 @@
 import hashlib
 import json
 import logging
+import os
+import sqlite3
+import string
+import threading
+import time
 from collections import defaultdict
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from itertools import groupby, islice
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 
 from ..config import ScanConfig
 from ..models import AIVerdict, Finding, Severity
 from ..utils.code_context import extract_snippet_context, load_file_contents
-from .ai_providers import AIProvider, create_provider
+
+if TYPE_CHECKING:
+    from .ai_providers import AIProvider
+    from .llm_cache import SemanticCache
 
 logger = logging.getLogger(__name__)
+
+# orjson is optional; it speeds up (de)serializing cached verdicts
+try:
+    import orjson
+
+    _loads = orjson.loads
+
+    def _dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+
+except ImportError:
+    _loads = json.loads
+    _dumps = json.dumps
+
+# Default location of the persistent AI verdict cache
+DEFAULT_AI_CACHE_PATH = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "truscan",
+    "ai_verdicts.sqlite",
+)
+# Default directory of the persistent semantic response cache
+DEFAULT_SEMANTIC_CACHE_PATH = os.path.join(os.path.dirname(DEFAULT_AI_CACHE_PATH), "semantic")
 # Ensure AI engine logs are visible when AI filtering is enabled
 # (logging level will be set by runner.py)
 
@@ -71,10 +104,139 @@ Respond in JSON format:
 }}
 """
 
+# Prompt template for analyzing several findings from the same file in one request
+FINDING_ANALYSIS_BATCH_PROMPT_TEMPLATE = """
+Semgrep Findings (JSON array under "findings", all from {file_path}):
+{findings_json}
+
+Tasks (for EACH finding above):
+1. Determine if this is a true positive or false positive. Consider:
+   - Is the vulnerability actually exploitable in this context?
+   - Are there mitigations (validation, sanitization, framework protections)?
+   - Is the code pattern actually dangerous here?
+   - Could an attacker realistically exploit this?
+
+2. Provide enhanced remediation guidance that is:
+   - Specific to this exact code pattern
+   - Actionable with step-by-step instructions
+   - Framework-aware (if Flask/Django/FastAPI detected)
+   - Includes a short code example showing the fix
+   - More detailed than the generic rule guidance
+
+Respond in JSON format with exactly one verdict per finding, echoing its "id":
+{{
+    "verdicts": [
+        {{
+            "id": "<id of the finding>",
+            "is_false_positive": true/false,
+            "confidence": 0.0-1.0,
+            "reasoning": "detailed explanation of why this is/isn't a false positive",
+            "enhanced_remediation": "concise, context-specific remediation guidance with code examples",
+            "suggested_severity": "critical|high|medium|low" (optional, only if different from current),
+            "additional_context": {{}}
+        }}
+    ]
+}}
+"""
+
+
+
+_TemplateParts = Tuple[Tuple[str, Optional[str]], ...]
+
+
+def _compile_template(template: str) -> _TemplateParts:
+    """
+    Pre-parse a str.format template into (literal_text, field_name) pairs.
+
+    The result is immutable, so one compiled template is shared by all
+    worker threads rendering prompts concurrently.
+    """
+    return tuple((literal, field) for literal, field, _, _ in string.Formatter().parse(template))
+
+
+def _render_template(parts: _TemplateParts, **values) -> str:
+    """Render a template compiled with _compile_template (same output as str.format)."""
+    out = []
+    for literal, field in parts:
+        out.append(literal)
+        if field is not None:
+            out.append(str(values[field]))
+    return "".join(out)
+
+
+# JSON schemas of the verdict responses, so providers that support
+# constrained output (structured outputs / tool use) always return valid JSON.
+# additional_context is left out: strict schemas can't hold free-form objects.
+_VERDICT_SCHEMA_PROPERTIES = {
+    "is_false_positive": {"type": "boolean"},
+    "confidence": {"type": "number"},
+    "reasoning": {"type": "string"},
+    "enhanced_remediation": {"type": "string"},
+    "suggested_severity": {
+        "type": ["string", "null"],
+        "enum": [s.value for s in Severity] + [None],
+    },
+}
+VERDICT_SCHEMA = {
+    "title": "Verdict",
+    "type": "object",
+    "properties": _VERDICT_SCHEMA_PROPERTIES,
+    "required": list(_VERDICT_SCHEMA_PROPERTIES),
+    "additionalProperties": False,
+}
+BATCH_VERDICT_SCHEMA = {
+    "title": "VerdictBatch",
+    "type": "object",
+    "properties": {
+        "verdicts": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"id": {"type": "string"}, **_VERDICT_SCHEMA_PROPERTIES},
+                "required": ["id", *_VERDICT_SCHEMA_PROPERTIES],
+                "additionalProperties": False,
+            },
+        },
+    },
+    "required": ["verdicts"],
+    "additionalProperties": False,
+}
+
+# Severity ordering used to prioritize findings (most severe first)
+_SEVERITY_RANK = {
+    Severity.CRITICAL: 0,
+    Severity.HIGH: 1,
+    Severity.MEDIUM: 2,
+    Severity.LOW: 3,
+    Severity.INFO: 4,
+}
+
+# Valid values for a verdict's suggested_severity
+_SEVERITY_VALUES = frozenset(s.value for s in Severity)
+
+# Output tokens budgeted per verdict in a batch response (reasoning plus a
+# remediation with a code example)
+_VERDICT_OUTPUT_TOKENS = 400
+
+# Templates are parsed once at import instead of by str.format on every call
+_FINDING_ANALYSIS_PROMPT_PARTS = _compile_template(FINDING_ANALYSIS_PROMPT_TEMPLATE)
+_FINDING_ANALYSIS_BATCH_PROMPT_PARTS = _compile_template(FINDING_ANALYSIS_BATCH_PROMPT_TEMPLATE)
+
 
 class AIEngine:
     """AI engine for analyzing and filtering security findings."""
 
+    __slots__ = (
+        "config",
+        "provider",
+        "cache",
+        "_cache_db",
+        "_cache_lock",
+        "_semantic_cache",
+        "_lines_by_file",
+        "_snippet_cache",
+    )
+
     def __init__(self, config: ScanConfig):
         """
         Initialize AI engine.
@@ -83,26 +245,58 @@ class AIEngine:
             config: Scan configuration with AI settings
         """
         self.config = config
-        self.provider: Optional[AIProvider] = None
+        self.provider: Optional["AIProvider"] = None
         self.cache: Dict[str, AIVerdict] = {}
+        self._cache_db: Optional[sqlite3.Connection] = None
+        self._cache_lock = threading.Lock()
+        self._semantic_cache: Optional["SemanticCache"] = None
+        # Per-file split lines and per-location code context, so findings in the
+        # same file don't re-read or re-split it
+        self._lines_by_file: Dict[str, List[str]] = {}
+        self._snippet_cache: Dict[Tuple[str, int, int], str] = {}
 
         if config.enable_ai_filter:
             try:
                 logger.info(f"Initializing AI provider: {config.ai_provider}...")
                 logger.debug(f"API key provided: {'Yes' if config.ai_api_key else 'No (will use env var)'}")
-                
+
+                # Imported here so scans without AI filtering don't load provider code
+                from .ai_providers import create_provider
+                from .llm_cache import LLMCache, SemanticCache
+
+                if config.ai_semantic_cache_threshold is not None:
+                    try:
+                        self._semantic_cache = SemanticCache(
+                            threshold=config.ai_semantic_cache_threshold,
+                            path=config.ai_semantic_cache_path or DEFAULT_SEMANTIC_CACHE_PATH,
+                        )
+                    except ImportError as e:
+                        logger.warning(f"⚠ Semantic AI cache disabled: {e}")
+
                 self.provider = create_provider(
                     provider_name=config.ai_provider,
                     api_key=config.ai_api_key,
                     model=config.ai_model,
+                    max_connections=config.ai_max_workers,
+                    max_retries=config.ai_max_retries,
+                    cache=LLMCache() if config.ai_cache_enabled else None,
+                    semantic_cache=self._semantic_cache,
+                    local_model=config.ai_local_model,
+                    local_confidence_threshold=config.ai_confidence_threshold,
                 )
                 logger.info(
                     f"✓ AI engine initialized with provider: {config.ai_provider}, "
                     f"model: {config.ai_model}"
                 )
+                if config.ai_cache_enabled:
+                    self._cache_db = self._open_cache()
             except ImportError as e:
                 logger.error(f"❌ Missing required package: {e}")
-                package_name = "openai" if config.ai_provider == "openai" else "anthropic"
+                package_name = {
+                    "openai": "openai",
+                    "anthropic": "anthropic",
+                    "local": "llama-cpp-python",
+                }.get(config.ai_provider, config.ai_provider)
                 logger.error(f"   Install with: pip install {package_name}")
                 logger.error(f"   Or install all AI dependencies: pip install -r requirements-ai.txt")
                 logger.warning("Continuing without AI filtering")
@@ -117,6 +311,40 @@ class AIEngine:
                 logger.warning("Continuing without AI filtering")
                 self.provider = None
 
+    def close(self) -> None:
+        """Close the AI provider (and its pooled HTTP client) and save the persistent caches."""
+        if self.provider is not None:
+            self.provider.close()
+        if self._semantic_cache is not None:
+            try:
+                self._semantic_cache.save()
+            except Exception as e:
+                logger.warning(f"⚠ Could not save semantic AI cache: {e}")
+            self._semantic_cache = None
+        if self._cache_db is not None:
+            with self._cache_lock:
+                self._cache_db.close()
+                self._cache_db = None
+
+    def __enter__(self) -> "AIEngine":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @classmethod
+    def maybe_create(cls, config: ScanConfig) -> Optional["AIEngine"]:
+        """
+        Create an AI engine only if AI filtering is enabled.
+
+        Args:
+            config: Scan configuration with AI settings
+
+        Returns:
+            AIEngine, or None when ``config.enable_ai_filter`` is off
+        """
+        return cls(config) if config.enable_ai_filter else None
+
     def filter_false_positives(
         self,
         findings: List[Finding],
@@ -168,80 +396,138 @@ class AIEngine:
         logger.info(f"  Using {self.config.ai_provider} model: {self.config.ai_model}")
         logger.info(f"  Confidence threshold: {self.config.ai_confidence_threshold}")
         logger.info(f"  Batch size: {self.config.ai_batch_size}")
+        logger.info(f"  Concurrent requests: {self.config.ai_max_workers}")
         if self.config.ai_max_findings:
             logger.info(f"  Max findings limit: {self.config.ai_max_findings} (prioritized by severity)")
 
-        # Group findings by file for batch processing
-        findings_by_file = defaultdict(list)
+        # Findings with the same cache key get the same verdict, so only one
+        # representative per key is sent to the provider
+        duplicates_by_key: Dict[str, List[Finding]] = defaultdict(list)
+        same_findings: Dict[int, List[Finding]] = {}
         for finding in findings_to_analyze:
-            findings_by_file[finding.location.file_path].append(finding)
+            cache_key = self._get_cache_key(finding, file_contents.get(finding.location.file_path, ""))
+            group = duplicates_by_key[cache_key]
+            if not group:
+                same_findings[id(finding)] = group
+            group.append(finding)
+        if len(same_findings) < len(findings_to_analyze):
+            logger.info(
+                f"  Deduplicated to {len(same_findings)} unique finding(s) "
+                f"({len(findings_to_analyze) - len(same_findings)} duplicate(s) share a verdict)"
+            )
+
+        # Order representatives by file, most severe first, for batch processing
+        representatives = [f for f in findings_to_analyze if id(f) in same_findings]
+        representatives.sort(key=lambda f: (f.location.file_path, _SEVERITY_RANK[f.severity]))
 
         # Process findings
         filtered_findings = []
         analyzed_count = 0
         filtered_count = 0
         remediation_enhanced_count = 0
-
-        for file_path, file_findings in findings_by_file.items():
-            # Process in batches
-            for i in range(0, len(file_findings), self.config.ai_batch_size):
-                batch = file_findings[i : i + self.config.ai_batch_size]
-                batch_num = (i // self.config.ai_batch_size) + 1
-                total_batches = (len(file_findings) + self.config.ai_batch_size - 1) // self.config.ai_batch_size
-                logger.info(f"  Processing batch {batch_num}/{total_batches} for {file_path} ({len(batch)} finding(s))")
-                
-                for finding in batch:
-                    finding_num = analyzed_count + 1
-                    logger.info(f"  🤖 [{finding_num}/{len(findings_to_analyze)}] Analyzing: {finding.rule_id} at {finding.location.file_path}:{finding.location.start_line}")
-                    verdict = self._analyze_finding(finding, file_contents.get(file_path, ""))
-                    if verdict:
-                        finding.ai_analysis = verdict
-                        analyzed_count += 1
-                        
-                        # Log AI analysis details
-                        logger.info(f"    📋 AI Analysis Results:")
-                        logger.info(f"      Verdict: {'False Positive' if verdict.is_false_positive else 'True Positive'}")
-                        logger.info(f"      Confidence: {verdict.confidence:.2f}")
-                        logger.info(f"      Reasoning: {verdict.reasoning}")
-                        
-                        if verdict.suggested_severity:
-                            logger.info(f"      Suggested Severity: {verdict.suggested_severity.value} (original: {finding.severity.value})")
-                        
-                        # Apply enhanced remediation if provided
-                        if verdict.enhanced_remediation:
-                            finding.remediation = verdict.enhanced_remediation
-                            finding.source = "ai-enhanced"
-                            remediation_enhanced_count += 1
-                            logger.info(f"    ✨ Enhanced Remediation:")
-                            # Log remediation in chunks to avoid overwhelming logs
-                            remediation_lines = verdict.enhanced_remediation.split('\n')
-                            for line in remediation_lines[:10]:  # First 10 lines
-                                logger.info(f"      {line}")
-                            if len(remediation_lines) > 10:
-                                logger.info(f"      ... ({len(remediation_lines) - 10} more lines)")
-                        
-                        if verdict.additional_context:
-                            logger.info(f"    📝 Additional Context: {verdict.additional_context}")
-
-                        # Filter if high confidence false positive
-                        if (
-                            verdict.is_false_positive
-                            and verdict.confidence >= self.config.ai_confidence_threshold
-                        ):
-                            finding.ai_filtered = True
-                            filtered_count += 1
-                            logger.info(f"    🚫 Filtered as false positive (confidence: {verdict.confidence:.2f} >= threshold: {self.config.ai_confidence_threshold})")
+        batch_size = self.config.ai_batch_size
+        # Keep each batch's verdicts within the provider's output token limit
+        max_output_tokens = getattr(self.provider, "max_output_tokens", None)
+        if max_output_tokens and batch_size * _VERDICT_OUTPUT_TOKENS > max_output_tokens:
+            batch_size = max(1, max_output_tokens // _VERDICT_OUTPUT_TOKENS)
+            logger.info(f"  Batch size capped at {batch_size} by the provider's output limit")
+        confidence_threshold = self.config.ai_confidence_threshold
+        total_to_analyze = len(findings_to_analyze)
+        log_info = logger.isEnabledFor(logging.INFO)
+        log_debug = logger.isEnabledFor(logging.DEBUG)
+
+        # Split each file's findings into batches
+        batches = []
+        for file_path, group in groupby(representatives, key=lambda f: f.location.file_path):
+            file_batches = []
+            while batch := list(islice(group, batch_size)):
+                file_batches.append(batch)
+            total_batches = len(file_batches)
+            for batch_num, batch in enumerate(file_batches, 1):
+                batches.append((file_path, batch_num, total_batches, batch))
+
+        def _run(batch_info):
+            file_path, _, _, batch = batch_info
+            return self._analyze_batch(batch, file_contents.get(file_path, ""))
+
+        # Provider calls are blocking network I/O, so run batches concurrently.
+        # map() yields results in submission order, so per-batch logging stays grouped.
+        max_workers = max(1, min(self.config.ai_max_workers, len(batches)))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for (file_path, batch_num, total_batches, batch), verdicts in zip(
+                batches, executor.map(_run, batches)
+            ):
+                if log_info:
+                    logger.info(
+                        "  Processing batch %d/%d for %s (%d finding(s))",
+                        batch_num, total_batches, file_path, len(batch),
+                    )
+                    for offset, finding in enumerate(batch, 1):
+                        location = finding.location
+                        logger.info(
+                            "  🤖 [%d/%d] Analyzed: %s at %s:%d",
+                            analyzed_count + offset, total_to_analyze,
+                            finding.rule_id, location.file_path, location.start_line,
+                        )
+
+                for representative, verdict in zip(batch, verdicts):
+                    for finding in same_findings[id(representative)]:
+                        if verdict:
+                            finding.ai_analysis = verdict
+                            analyzed_count += 1
+
+                            # Log AI analysis details
+                            if log_info:
+                                logger.info("    📋 AI Analysis Results:")
+                                logger.info(
+                                    "      Verdict: %s",
+                                    "False Positive" if verdict.is_false_positive else "True Positive",
+                                )
+                                logger.info("      Confidence: %.2f", verdict.confidence)
+                                logger.info("      Reasoning: %s", verdict.reasoning)
+                                if verdict.suggested_severity:
+                                    logger.info(
+                                        "      Suggested Severity: %s (original: %s)",
+                                        verdict.suggested_severity.value, finding.severity.value,
+                                    )
+
+                            # Apply enhanced remediation if provided
+                            if verdict.enhanced_remediation:
+                                finding.remediation = verdict.enhanced_remediation
+                                finding.source = "ai-enhanced"
+                                remediation_enhanced_count += 1
+                                logger.info("    ✨ Enhanced Remediation provided")
+                                if log_debug:
+                                    # Log remediation in chunks to avoid overwhelming logs
+                                    remediation_lines = verdict.enhanced_remediation.split('\n')
+                                    for line in remediation_lines[:10]:  # First 10 lines
+                                        logger.debug("      %s", line)
+                                    if len(remediation_lines) > 10:
+                                        logger.debug("      ... (%d more lines)", len(remediation_lines) - 10)
+
+                            if verdict.additional_context:
+                                logger.info("    📝 Additional Context: %s", verdict.additional_context)
+
+                            # Filter if high confidence false positive
+                            if verdict.is_false_positive and verdict.confidence >= confidence_threshold:
+                                finding.ai_filtered = True
+                                filtered_count += 1
+                                logger.info(
+                                    "    🚫 Filtered as false positive (confidence: %.2f >= threshold: %s)",
+                                    verdict.confidence, confidence_threshold,
+                                )
+                            else:
+                                logger.info("    ✓ Confirmed as true positive (confidence: %.2f)", verdict.confidence)
+                                filtered_findings.append(finding)
                         else:
-                            logger.info(f"    ✓ Confirmed as true positive (confidence: {verdict.confidence:.2f})")
+                            # If analysis failed, keep the finding
                             filtered_findings.append(finding)
-                    else:
-                        # If analysis failed, keep the finding
-                        filtered_findings.append(finding)
 
-        # Add findings that weren't analyzed
-        analyzed_rule_ids = {f.rule_id for f in findings_to_analyze}
+        # Add findings that weren't analyzed (tracked by identity, since the
+        # same rule can have both analyzed and skipped findings)
+        analyzed = set(map(id, findings_to_analyze))
         for finding in findings:
-            if finding.rule_id not in analyzed_rule_ids:
+            if id(finding) not in analyzed:
                 filtered_findings.append(finding)
 
         logger.info("")
@@ -285,8 +571,8 @@ class AIEngine:
             ai_recommended = finding.metadata.get("ai_analysis_recommended", False)
             
             logger.info(
-                f"Finding {finding.rule_id} - confidence: {rule_confidence}, "
-                f"ai_recommended: {ai_recommended}"
+                "Finding %s - confidence: %s, ai_recommended: %s",
+                finding.rule_id, rule_confidence, ai_recommended,
             )
             
             # Include if:
@@ -303,17 +589,10 @@ class AIEngine:
             else:
                 # Skip high confidence findings (unless recommended)
                 skipped_high_confidence += 1
-                logger.debug(f"Skipping {finding.rule_id} - high confidence, not recommended for AI")
+                logger.debug("Skipping %s - high confidence, not recommended for AI", finding.rule_id)
 
         # Sort by severity (critical, high, medium, low, info) to prioritize important findings
-        severity_order = {
-            Severity.CRITICAL: 0,
-            Severity.HIGH: 1,
-            Severity.MEDIUM: 2,
-            Severity.LOW: 3,
-            Severity.INFO: 4,
-        }
-        filtered.sort(key=lambda f: severity_order.get(f.severity, 99))
+        filtered.sort(key=lambda f: _SEVERITY_RANK[f.severity])
         
         # Apply maximum limit if configured
         original_count = len(filtered)
@@ -338,6 +617,120 @@ class AIEngine:
 
         return filtered
 
+    def _analyze_batch(
+        self,
+        findings: List[Finding],
+        file_content: str,
+    ) -> List[Optional[AIVerdict]]:
+        """
+        Analyze several findings from the same file with a single AI request.
+
+        Cached findings are answered from the cache; only the remaining ones are
+        packed into one prompt. Findings the model did not return a verdict for
+        are retried individually.
+
+        Args:
+            findings: Findings to analyze (all from the same file)
+            file_content: Full file content
+
+        Returns:
+            List of AIVerdict (or None if analysis failed), aligned with findings
+        """
+        verdicts: List[Optional[AIVerdict]] = [None] * len(findings)
+        uncached: Dict[str, int] = {}
+        cache_keys: Dict[str, str] = {}
+
+        for index, finding in enumerate(findings):
+            cache_key = self._get_cache_key(finding, file_content)
+            cached = self._cache_get(cache_key)
+            if cached:
+                logger.info("    💾 Using cached AI analysis for %s", finding.rule_id)
+                verdicts[index] = cached
+            elif finding.location.snippet or file_content:
+                finding_id = str(index)
+                uncached[finding_id] = index
+                cache_keys[finding_id] = cache_key
+
+        if not uncached:
+            return verdicts
+
+        # A single finding does not benefit from the batch prompt
+        if len(uncached) == 1:
+            index = next(iter(uncached.values()))
+            verdicts[index] = self._analyze_finding(findings[index], file_content)
+            return verdicts
+
+        logger.info("    → Sending %d finding(s) to AI provider in one request...", len(uncached))
+
+        items = []
+        for finding_id, index in uncached.items():
+            finding = findings[index]
+            items.append({
+                "id": finding_id,
+                "rule_id": finding.rule_id,
+                "message": finding.message,
+                "severity": finding.severity.value,
+                "category": finding.category.value,
+                "cwe": finding.cwe or "N/A",
+                "location": f"{finding.location.file_path}:{finding.location.start_line}:{finding.location.start_column}",
+                "rule_description": finding.metadata.get("description", "No description available"),
+                "remediation": finding.remediation or "No remediation guidance available",
+                "code_context": self._get_code_context(finding, file_content),
+            })
+
+        prompt = _render_template(
+            _FINDING_ANALYSIS_BATCH_PROMPT_PARTS,
+            file_path=findings[0].location.file_path,
+            findings_json=json.dumps({"findings": items}, indent=2),
+        )
+
+        try:
+            response = self.provider.analyze(
+                prompt,
+                SYSTEM_PROMPT,
+                BATCH_VERDICT_SCHEMA,
+                max_tokens=len(items) * _VERDICT_OUTPUT_TOKENS,
+                # Verdicts are matched to findings by id ("0", "1", ...), so a
+                # similar batch's response would attach to the wrong findings
+                use_semantic_cache=False,
+            )
+            logger.info("    ✓ AI batch analysis received")
+        except ValueError as e:
+            # Unparseable (e.g. truncated) response - retry findings individually
+            logger.warning(f"    ⚠ AI batch response could not be parsed: {e}")
+            response = None
+        except Exception as e:
+            logger.error(f"    ❌ AI batch analysis failed: {e}")
+            return verdicts
+
+        # Anything malformed is left in uncached and retried individually below
+        response_verdicts = response.get("verdicts") if isinstance(response, dict) else None
+        if not isinstance(response_verdicts, list):
+            response_verdicts = []
+        for item in response_verdicts:
+            if not isinstance(item, dict):
+                continue
+            finding_id = str(item.get("id"))
+            if finding_id not in uncached:
+                continue
+            try:
+                verdict = self._build_verdict(item)
+            except (TypeError, ValueError) as e:
+                logger.debug("    Ignoring malformed batch verdict %s: %s", finding_id, e)
+                continue
+            index = uncached.pop(finding_id)
+            self._cache_set(cache_keys[finding_id], verdict)
+            verdicts[index] = verdict
+
+        if uncached:
+            logger.warning(
+                f"    ⚠ AI batch response missing {len(uncached)} verdict(s), analyzing individually"
+            )
+            for index in uncached.values():
+                verdicts[index] = self._analyze_finding(findings[index], file_content)
+
+        return verdicts
+
     def _analyze_finding(
         self,
         finding: Finding,
@@ -355,24 +748,24 @@ class AIEngine:
         """
         # Check cache
         cache_key = self._get_cache_key(finding, file_content)
-        if self.config.ai_cache_enabled and cache_key in self.cache:
-            logger.info(f"    💾 Using cached AI analysis")
-            return self.cache[cache_key]
+        cached = self._cache_get(cache_key)
+        if cached:
+            logger.info("    💾 Using cached AI analysis")
+            return cached
+        if not finding.location.snippet and not file_content:
+            # Nothing to show the model; leave the finding unanalyzed
+            return None
 
-        logger.info(f"    → Sending to AI provider...")
+        logger.info("    → Sending to AI provider...")
 
         # Build prompt
-        code_context = extract_snippet_context(
-            snippet=finding.location.snippet,
-            file_path=finding.location.file_path,
-            line_number=finding.location.start_line,
-            context_lines=50,
-        )
+        code_context = self._get_code_context(finding, file_content)
 
         rule_description = finding.metadata.get("description", "No description available")
         remediation = finding.remediation or "No remediation guidance available"
 
-        prompt = FINDING_ANALYSIS_PROMPT_TEMPLATE.format(
+        prompt = _render_template(
+            _FINDING_ANALYSIS_PROMPT_PARTS,
             rule_id=finding.rule_id,
             message=finding.message,
             severity=finding.severity.value,
@@ -389,8 +782,8 @@ class AIEngine:
         try:
             # Call AI provider with timeout protection
             try:
-                response = self.provider.analyze(prompt, SYSTEM_PROMPT)
-                logger.info(f"    ✓ AI analysis received")
+                response = self.provider.analyze(prompt, SYSTEM_PROMPT, VERDICT_SCHEMA)
+                logger.info("    ✓ AI analysis received")
             except Exception as api_error:
                 error_msg = str(api_error)
                 if "timeout" in error_msg.lower() or "timed out" in error_msg.lower():
@@ -402,37 +795,10 @@ class AIEngine:
                 else:
                     raise
 
-            # Parse response
-            # Validate suggested_severity before converting to enum
-            suggested_severity_value = response.get("suggested_severity")
-            suggested_severity = None
-            if suggested_severity_value:
-                # Check if it's a valid Severity enum value (case-insensitive)
-                severity_str = str(suggested_severity_value).lower().strip()
-                if severity_str in [s.value for s in Severity]:
-                    try:
-                        suggested_severity = Severity(severity_str)
-                    except (ValueError, KeyError):
-                        # Invalid severity value, ignore it
-                        logger.debug(f"    Invalid suggested_severity: {suggested_severity_value}, ignoring")
-                        suggested_severity = None
-                else:
-                    # Not a valid severity value (e.g., "none"), ignore it
-                    logger.debug(f"    Invalid suggested_severity: {suggested_severity_value}, ignoring")
-                    suggested_severity = None
-            
-            verdict = AIVerdict(
-                is_false_positive=response.get("is_false_positive", False),
-                confidence=float(response.get("confidence", 0.5)),
-                reasoning=response.get("reasoning", "No reasoning provided"),
-                enhanced_remediation=response.get("enhanced_remediation"),
-                suggested_severity=suggested_severity,
-                additional_context=response.get("additional_context", {}),
-            )
+            verdict = self._build_verdict(response)
 
             # Cache result
-            if self.config.ai_cache_enabled:
-                self.cache[cache_key] = verdict
+            self._cache_set(cache_key, verdict)
 
             return verdict
 
@@ -440,11 +806,144 @@ class AIEngine:
             logger.error(f"    ❌ AI analysis failed: {e}")
             return None
 
+    def _get_code_context(self, finding: Finding, file_content: str, context_lines: int = 50) -> str:
+        """Get the code context for a finding, reusing pre-loaded file content."""
+        file_path = finding.location.file_path
+        key = (file_path, finding.location.start_line, context_lines)
+        context = self._snippet_cache.get(key)
+        if context is not None:
+            return context
+
+        lines = None
+        if file_content:
+            lines = self._lines_by_file.get(file_path)
+            if lines is None:
+                lines = file_content.splitlines(keepends=True)
+                self._lines_by_file[file_path] = lines
+
+        context = extract_snippet_context(
+            snippet=finding.location.snippet,
+            file_path=file_path,
+            line_number=finding.location.start_line,
+            context_lines=context_lines,
+            lines=lines,
+        )
+        self._snippet_cache[key] = context
+        return context
+
+    def _open_cache(self) -> Optional[sqlite3.Connection]:
+        """Open (and create if needed) the persistent AI verdict cache."""
+        cache_path = self.config.ai_cache_path or DEFAULT_AI_CACHE_PATH
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(cache_path)), exist_ok=True)
+            conn = sqlite3.connect(cache_path, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS verdicts(key TEXT PRIMARY KEY, json TEXT, ts INTEGER)"
+            )
+            if self.config.ai_cache_ttl is not None:
+                conn.execute(
+                    "DELETE FROM verdicts WHERE ts < ?",
+                    (int(time.time()) - self.config.ai_cache_ttl,),
+                )
+            logger.debug(f"Using persistent AI cache: {cache_path}")
+            return conn
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Could not open AI cache {cache_path}, using in-memory cache only: {e}")
+            return None
+
+    def _persistent_cache_key(self, cache_key: str) -> str:
+        """Scope a cache key to the provider and model that produced the verdict."""
+        return f"{self.config.ai_provider}:{self.config.ai_model}:{cache_key}"
+
+    def _cache_get(self, cache_key: str) -> Optional[AIVerdict]:
+        """Look up a verdict in the in-memory cache, then the persistent cache."""
+        if not self.config.ai_cache_enabled:
+            return None
+        verdict = self.cache.get(cache_key)
+        if verdict is not None or self._cache_db is None:
+            return verdict
+
+        try:
+            with self._cache_lock:
+                row = self._cache_db.execute(
+                    "SELECT json, ts FROM verdicts WHERE key=?",
+                    (self._persistent_cache_key(cache_key),),
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.debug(f"AI cache lookup failed: {e}")
+            return None
+        if row is None:
+            return None
+        ttl = self.config.ai_cache_ttl
+        if ttl is not None and row[1] < time.time() - ttl:
+            # Expired, so the finding is re-analyzed (and the row replaced)
+            return None
+
+        try:
+            data = _loads(row[0])
+            if data.get("suggested_severity"):
+                data["suggested_severity"] = Severity(data["suggested_severity"])
+            verdict = AIVerdict(**data)
+        except (ValueError, TypeError) as e:
+            logger.debug(f"Ignoring unreadable AI cache entry: {e}")
+            return None
+        self.cache[cache_key] = verdict
+        return verdict
+
+    def _cache_set(self, cache_key: str, verdict: AIVerdict) -> None:
+        """Store a verdict in the in-memory cache and write it through to disk."""
+        if not self.config.ai_cache_enabled:
+            return
+        self.cache[cache_key] = verdict
+        if self._cache_db is None:
+            return
+
+        try:
+            with self._cache_lock:
+                self._cache_db.execute(
+                    "INSERT OR REPLACE INTO verdicts(key, json, ts) VALUES (?, ?, ?)",
+                    (self._persistent_cache_key(cache_key), _dumps(asdict(verdict)), int(time.time())),
+                )
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.debug(f"AI cache write failed: {e}")
+
+    def _build_verdict(self, response: Dict) -> AIVerdict:
+        """Build an AIVerdict from a parsed AI response."""
+        # Validate suggested_severity before converting to enum
+        suggested_severity_value = response.get("suggested_severity")
+        suggested_severity = None
+        if suggested_severity_value:
+            # Check if it's a valid Severity enum value (case-insensitive)
+            severity_str = str(suggested_severity_value).lower().strip()
+            if severity_str in _SEVERITY_VALUES:
+                suggested_severity = Severity(severity_str)
+            else:
+                # Not a valid severity value (e.g., "none"), ignore it
+                logger.debug("    Invalid suggested_severity: %s, ignoring", suggested_severity_value)
+
+        return AIVerdict(
+            is_false_positive=response.get("is_false_positive", False),
+            confidence=float(response.get("confidence", 0.5)),
+            reasoning=response.get("reasoning", "No reasoning provided"),
+            enhanced_remediation=response.get("enhanced_remediation"),
+            suggested_severity=suggested_severity,
+            additional_context=response.get("additional_context", {}),
+        )
+
     def _get_cache_key(self, finding: Finding, file_content: str) -> str:
         """Generate cache key for a finding."""
-        # Use rule ID + code snippet hash
+        # Use rule ID + code snippet hash, plus the surrounding code the
+        # verdict was based on, so edits near the match invalidate it
         snippet = finding.location.snippet or ""
-        content_hash = hashlib.md5(
-            f"{finding.rule_id}:{snippet}:{finding.location.start_line}".encode()
-        ).hexdigest()
-        return f"{finding.rule_id}:{content_hash}"
+        # BLAKE2b is faster than MD5 and the key needs no cryptographic strength
+        content_hash = hashlib.blake2b(digest_size=16)
+        content_hash.update(finding.rule_id.encode())
+        content_hash.update(b":")
+        content_hash.update(snippet.encode())
+        content_hash.update(b":")
+        content_hash.update(str(finding.location.start_line).encode())
+        content_hash.update(b":")
+        content_hash.update(self._get_code_context(finding, file_content).encode())
+        return f"{finding.rule_id}:{content_hash.hexdigest()}"
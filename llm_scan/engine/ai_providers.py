@@ -1,12 +1,66 @@
 """AI provider implementations for different LLM APIs."""
 
+import functools
 import json
 import logging
+import os
+import re
+import threading
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+from .llm_cache import LLMCache
+
+if TYPE_CHECKING:
+    from .llm_cache import SemanticCache
 
 logger = logging.getLogger(__name__)
 
+# Fastest available JSON decoder: msgspec, then orjson, then the stdlib.
+# Errors are always json.JSONDecodeError (orjson's subclasses it; msgspec's is
+# translated), so the parse fallbacks below are unchanged.
+try:
+    import msgspec
+
+    _msgspec_decode = msgspec.json.decode
+
+    def _loads(content: str) -> Any:
+        try:
+            return _msgspec_decode(content)
+        except msgspec.DecodeError as e:
+            raise json.JSONDecodeError(str(e), content, 0) from None
+
+except ImportError:
+    try:
+        import orjson
+
+        _loads = orjson.loads
+    except ImportError:
+        _loads = json.loads
+
+# Matches a JSON escape: group 1 is set only for an invalid one (e.g. "\\d" in a path)
+_ESCAPE_RE = re.compile(r'\\(?:u[0-9a-fA-F]{4}|["\\/bfnrt]|(.))')
+
+# Body of the first ```json fenced block, without surrounding whitespace
+_FENCE_RE = re.compile(r"```json\s*(.*?)\s*```", re.DOTALL)
+
+# Retries for rate limits, timeouts and transient API errors. The SDK clients
+# back off exponentially with jitter and honor Retry-After headers.
+DEFAULT_MAX_RETRIES = 5
+
+# Appended to the system prompt for models without response_format support
+_JSON_ONLY_INSTRUCTION = (
+    "IMPORTANT: Respond ONLY with valid JSON. "
+    "Do not include any markdown formatting or explanatory text."
+)
+
+
+def _fix_invalid_escape(match: "re.Match[str]") -> str:
+    """Keep a valid escape; double the backslash of an invalid one."""
+    invalid = match.group(1)
+    return match.group(0) if invalid is None else "\\\\" + invalid
+
 
 def _fix_json_escapes(content: str) -> str:
     """
@@ -17,39 +71,8 @@ def _fix_json_escapes(content: str) -> str:
     
     Valid JSON escapes: \" \\ \/ \b \f \n \r \t \\uXXXX
     """
-    import re
-    
-    # Simple approach: find all \X patterns and check if X is valid
-    # Process from right to left to avoid index shifts
-    
-    # First, temporarily replace valid escapes with placeholders
-    placeholders = {}
-    counter = 0
-    
-    def make_placeholder(match):
-        nonlocal counter
-        placeholder = f"__VALID_ESCAPE_{counter}__"
-        placeholders[placeholder] = match.group(0)
-        counter += 1
-        return placeholder
-    
-    # Protect valid escapes
-    # Unicode escapes: \uXXXX
-    content = re.sub(r'\\u[0-9a-fA-F]{4}', make_placeholder, content, flags=re.IGNORECASE)
-    # Single char escapes: \" \\ \/ \b \f \n \r \t
-    content = re.sub(r'\\(["\\/bfnrt])', make_placeholder, content)
-    
-    # Now fix any remaining \X (these are invalid)
-    def fix_invalid(match):
-        return '\\\\' + match.group(1)
-    
-    content = re.sub(r'\\(.)', fix_invalid, content)
-    
-    # Restore valid escapes
-    for placeholder, original in placeholders.items():
-        content = content.replace(placeholder, original)
-    
-    return content
+    # Single left-to-right pass: valid escapes are matched first and kept
+    return _ESCAPE_RE.sub(_fix_invalid_escape, content)
 
 
 def _parse_json_with_fallback(content: str) -> Dict[str, Any]:
@@ -65,34 +88,36 @@ def _parse_json_with_fallback(content: str) -> Dict[str, Any]:
     Raises:
         json.JSONDecodeError: If all parsing strategies fail
     """
-    # Strategy 1: Try direct parsing
-    try:
-        return json.loads(content)
-    except json.JSONDecodeError:
-        pass
+    # Strategy 1: Try direct parsing. Clean responses (the common case with
+    # response_format) are a bare object, so anything else skips straight to
+    # the fallbacks instead of raising here first
+    stripped = content.strip()
+    if stripped.startswith("{") and stripped.endswith("}"):
+        try:
+            return _loads(stripped)
+        except json.JSONDecodeError:
+            pass
     
     # Strategy 2: Try fixing escape sequences
     try:
         fixed_content = _fix_json_escapes(content)
-        return json.loads(fixed_content)
+        return _loads(fixed_content)
     except json.JSONDecodeError:
         pass
     
     # Strategy 3: Extract from markdown code blocks
-    if "```json" in content:
-        json_start = content.find("```json") + 7
-        json_end = content.find("```", json_start)
-        if json_end > json_start:
-            extracted = content[json_start:json_end].strip()
+    fence = _FENCE_RE.search(content)
+    if fence and fence.group(1):
+        extracted = fence.group(1)
+        try:
+            return _loads(extracted)
+        except json.JSONDecodeError:
+            # Try fixing escapes in extracted content
             try:
-                return json.loads(extracted)
+                fixed_extracted = _fix_json_escapes(extracted)
+                return _loads(fixed_extracted)
             except json.JSONDecodeError:
-                # Try fixing escapes in extracted content
-                try:
-                    fixed_extracted = _fix_json_escapes(extracted)
-                    return json.loads(fixed_extracted)
-                except json.JSONDecodeError:
-                    pass
+                pass
     
     # Strategy 4: Try to find JSON object boundaries
     # Look for first { and last }
@@ -101,11 +126,11 @@ def _parse_json_with_fallback(content: str) -> Dict[str, Any]:
     if first_brace >= 0 and last_brace > first_brace:
         extracted = content[first_brace:last_brace + 1]
         try:
-            return json.loads(extracted)
+            return _loads(extracted)
         except json.JSONDecodeError:
             try:
                 fixed_extracted = _fix_json_escapes(extracted)
-                return json.loads(fixed_extracted)
+                return _loads(fixed_extracted)
             except json.JSONDecodeError:
                 pass
     
@@ -113,17 +138,172 @@ def _parse_json_with_fallback(content: str) -> Dict[str, Any]:
     raise json.JSONDecodeError("Failed to parse JSON after all fallback strategies", content, 0)
 
 
+def _create_http_client(max_connections: int) -> Optional[Any]:
+    """
+    Build a pooled HTTP client to share across all requests of a provider.
+
+    Concurrent ``analyze`` calls then reuse kept-alive connections instead of
+    paying a TCP/TLS handshake each. HTTP/2 is enabled when ``h2`` is installed.
+
+    Args:
+        max_connections: Maximum number of pooled connections
+
+    Returns:
+        httpx.Client, or None if httpx is unavailable (the SDK default is used)
+    """
+    try:
+        import httpx
+    except ImportError:
+        return None
+
+    try:
+        import h2  # noqa: F401
+        http2 = True
+    except ImportError:
+        http2 = False
+
+    return httpx.Client(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+        ),
+        timeout=60.0,
+    )
+
+
 class AIProvider(ABC):
     """Abstract base class for AI providers."""
 
+    model: str
+    # Optional response caches, set by concrete providers
+    cache: Optional["LLMCache"] = None
+    semantic_cache: Optional["SemanticCache"] = None
+    # SDK client, set by concrete providers
+    client: Any = None
+    # Largest max_tokens a request may ask for (None = no known limit)
+    max_output_tokens: Optional[int] = None
+
+    def __init__(self):
+        # Requests currently being made, by request key (see _coalesce)
+        self._inflight: Dict[str, "Future[Dict[str, Any]]"] = {}
+        self._inflight_lock = threading.Lock()
+
+    def _request_key(self, messages: List[Dict[str, Any]], system_prompt: Optional[str] = None) -> str:
+        """Key identifying a request, as used by the exact-match cache."""
+        if system_prompt:
+            messages = [{"role": "system", "content": system_prompt}, *messages]
+        return LLMCache.cache_key(self.model, messages, 0.1)
+
+    def _coalesce(self, key: str, call: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Run call once for concurrent identical requests (single flight).
+
+        The first caller for a key makes the request; callers arriving while
+        it is in flight wait for and share its result (or exception) instead
+        of sending a duplicate.
+
+        Args:
+            key: Request key (see _request_key)
+            call: Makes the request and returns the parsed response
+
+        Returns:
+            Parsed response
+        """
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = self._inflight[key] = Future()
+        if not is_leader:
+            logger.debug("Waiting for identical in-flight request")
+            return future.result()
+
+        try:
+            result = call()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+
+    def close(self) -> None:
+        """Close the SDK client and its pooled HTTP connections."""
+        if self.client is not None and hasattr(self.client, "close"):
+            self.client.close()
+
+    def __enter__(self) -> "AIProvider":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _cache_lookup(
+        self, messages: List[Dict[str, Any]], prompt: str, use_semantic_cache: bool = True
+    ) -> Tuple[Optional[Dict[str, Any]], Tuple[Optional[str], Any]]:
+        """
+        Look up a response in the exact-match and semantic caches.
+
+        Args:
+            messages: Chat messages that would be sent to the model
+            prompt: Dynamic user prompt (embedded for the semantic cache)
+            use_semantic_cache: Whether to consult (and later fill) the semantic cache
+
+        Returns:
+            Tuple of (cached response or None, token to pass to _cache_store)
+        """
+        key = embedding = None
+        if self.cache is not None:
+            key = self.cache.cache_key(self.model, messages, 0.1)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached, (key, embedding)
+        if self.semantic_cache is not None and use_semantic_cache:
+            try:
+                embedding = self.semantic_cache.embed(prompt)
+                cached = self.semantic_cache.get(embedding)
+            except Exception as e:
+                logger.debug(f"Semantic cache lookup failed: {e}")
+                embedding = cached = None
+            if cached is not None:
+                if key is not None:
+                    self.cache.set(key, cached)
+                return cached, (key, embedding)
+        return None, (key, embedding)
+
+    def _cache_store(self, token: Tuple[Optional[str], Any], result: Dict[str, Any]) -> None:
+        """Store a parsed response in the caches consulted by _cache_lookup."""
+        key, embedding = token
+        if key is not None:
+            self.cache.set(key, result)
+        if embedding is not None:
+            self.semantic_cache.set(embedding, result)
+
     @abstractmethod
-    def analyze(self, prompt: str, system_prompt: Optional[str] = None) -> Dict[str, Any]:
+    def analyze(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        response_schema: Optional[Dict[str, Any]] = None,
+        max_tokens: Optional[int] = None,
+        use_semantic_cache: bool = True,
+    ) -> Dict[str, Any]:
         """
         Analyze a prompt and return structured response.
 
         Args:
             prompt: User prompt
             system_prompt: Optional system prompt
+            response_schema: Optional JSON schema the response must follow
+                (enforced where the provider supports constrained output)
+            max_tokens: Output token budget for the response (optional,
+                uses the provider default; capped at max_output_tokens)
+            use_semantic_cache: Whether a response to a similar prompt may be
+                reused (False when the response must match this exact prompt)
 
         Returns:
             Dictionary with analysis results
@@ -134,38 +314,86 @@ class AIProvider(ABC):
 class OpenAIProvider(AIProvider):
     """OpenAI API provider."""
 
-    # Models that support response_format with json_object
-    JSON_SUPPORTED_MODELS = {
-        "gpt-4-turbo",
-        "gpt-4-turbo-preview",
-        "gpt-4-0125-preview",
-        "gpt-4-1106-preview",
-        "gpt-3.5-turbo-0125",
-        "gpt-3.5-turbo-1106",
-        "gpt-4o",
-        "gpt-4o-mini",
+    # Whether a model supports response_format with json_object, by exact name
+    JSON_MODEL_TABLE = {
+        "gpt-4o": True,
+        "gpt-4o-2024-05-13": True,
+        "gpt-4o-2024-08-06": True,
+        "gpt-4o-2024-11-20": True,
+        "gpt-4o-mini": True,
+        "gpt-4o-mini-2024-07-18": True,
+        "gpt-4o-realtime-preview": False,
+        "gpt-4o-audio-preview": False,
+        "gpt-4-turbo": True,
+        "gpt-4-turbo-2024-04-09": True,
+        "gpt-4-turbo-preview": True,
+        "gpt-4-0125-preview": True,
+        "gpt-4-1106-preview": True,
+        "gpt-4-vision-preview": False,
+        "gpt-4": False,
+        "gpt-4-0613": False,
+        "gpt-4-32k": False,
+        "gpt-3.5-turbo": True,
+        "gpt-3.5-turbo-0125": True,
+        "gpt-3.5-turbo-1106": True,
+        "gpt-3.5-turbo-0613": False,
+        "gpt-3.5-turbo-16k": False,
+        "gpt-3.5-turbo-instruct": False,
+        "gpt-4.1": True,
+        "gpt-4.1-mini": True,
+        "gpt-4.1-nano": True,
+    }
+    # Families whose unlisted (e.g. newer dated) models support json_object
+    JSON_SUPPORTED_PREFIXES = ("gpt-4o", "gpt-4-turbo", "gpt-4.1", "gpt-5")
+    # Models that support Structured Outputs (response_format json_schema)
+    STRUCTURED_OUTPUT_MODELS = frozenset({"gpt-4o", "gpt-4o-mini"})
+    STRUCTURED_OUTPUT_PREFIXES = (
         "gpt-4o-2024-08-06",
+        "gpt-4o-2024-11-20",
         "gpt-4o-mini-2024-07-18",
-    }
-
-    def __init__(self, api_key: Optional[str] = None, model: str = "gpt-4"):
+        "gpt-4.1",
+        "gpt-5",
+    )
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model: str = "gpt-4",
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        http_client: Optional[Any] = None,
+        cache: Optional["LLMCache"] = None,
+        semantic_cache: Optional["SemanticCache"] = None,
+    ):
         """
         Initialize OpenAI provider.
 
         Args:
             api_key: OpenAI API key (or use OPENAI_API_KEY env var)
             model: Model name (e.g., "gpt-4", "gpt-3.5-turbo")
+            max_retries: Retries on rate limits, timeouts and transient errors
+            http_client: Shared httpx client (optional, uses the SDK default)
+            cache: Exact-match response cache (optional)
+            semantic_cache: Similarity-based response cache (optional)
         """
+        super().__init__()
         try:
             import openai
             # Set timeout on client to prevent hanging (60 seconds)
             self.client = openai.OpenAI(
                 api_key=api_key,
                 timeout=60.0,  # 60 second timeout for all requests
+                max_retries=max_retries,
+                http_client=http_client,
             )
             self.model = model
+            self.cache = cache
+            self.semantic_cache = semantic_cache
             # Check if model supports JSON response format
             self.supports_json_format = self._model_supports_json_format(model)
+            self.supports_structured_outputs = (
+                model in self.STRUCTURED_OUTPUT_MODELS
+                or model.startswith(self.STRUCTURED_OUTPUT_PREFIXES)
+            )
         except ImportError:
             raise ImportError(
                 "openai package is required. Install with: pip install openai"
@@ -175,112 +403,199 @@ class OpenAIProvider(AIProvider):
 
     def _model_supports_json_format(self, model: str) -> bool:
         """Check if model supports response_format with json_object."""
-        # Check exact match
-        if model in self.JSON_SUPPORTED_MODELS:
-            return True
-        # Check if model name starts with a supported prefix
-        for supported in self.JSON_SUPPORTED_MODELS:
-            if model.startswith(supported.split("-")[0] + "-"):  # e.g., "gpt-4-turbo" matches "gpt-4-turbo-*"
-                # For newer models, check if it's a turbo/o variant
-                if "turbo" in model or "o" in model:
-                    return True
-        return False
-
-    def analyze(self, prompt: str, system_prompt: Optional[str] = None) -> Dict[str, Any]:
+        return _supports_json_format(model)
+
+    def _build_messages(self, prompt: str, system_prompt: Optional[str]) -> List[Dict[str, Any]]:
+        """Build chat messages with static instructions first and the prompt last."""
+        # A byte-identical request prefix across calls enables server-side prompt caching
+        static_prompt = system_prompt or ""
+        if not self.supports_json_format:
+            # Request JSON in the instructions if model doesn't support response_format
+            if static_prompt:
+                static_prompt = f"{static_prompt}\n\n{_JSON_ONLY_INSTRUCTION}"
+            else:
+                static_prompt = _JSON_ONLY_INSTRUCTION
+
+        messages = []
+        if static_prompt:
+            messages.append({"role": "system", "content": static_prompt})
+        messages.append({"role": "user", "content": prompt})
+        return messages
+
+    def _build_openai_params(
+        self,
+        messages: List[Dict[str, Any]],
+        include_response_format: bool,
+        response_schema: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Build chat completion parameters.
+
+        Args:
+            messages: Chat messages
+            include_response_format: Whether to request JSON via response_format
+                (only applied for supported models)
+            response_schema: Optional JSON schema for Structured Outputs
+
+        Returns:
+            Keyword arguments for chat.completions.create
+        """
+        request_params = {
+            "model": self.model,
+            "messages": messages,
+            "temperature": 0.1,  # Low temperature for consistent analysis
+        }
+        if not include_response_format:
+            return request_params
+
+        # A schema makes the output conform exactly, so the parse fallbacks aren't needed
+        if response_schema and self.supports_structured_outputs:
+            request_params["response_format"] = {
+                "type": "json_schema",
+                "json_schema": {
+                    "name": response_schema.get("title", "response"),
+                    "schema": response_schema,
+                    "strict": True,
+                },
+            }
+        elif self.supports_json_format:
+            request_params["response_format"] = {"type": "json_object"}
+        return request_params
+
+    def analyze(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        response_schema: Optional[Dict[str, Any]] = None,
+        max_tokens: Optional[int] = None,
+        use_semantic_cache: bool = True,
+    ) -> Dict[str, Any]:
         """Analyze using OpenAI API."""
+        messages = self._build_messages(prompt, system_prompt)
+
+        cached, cache_token = self._cache_lookup(messages, prompt, use_semantic_cache)
+        if cached is not None:
+            logger.debug("Using cached OpenAI response")
+            return cached
+
+        return self._coalesce(
+            cache_token[0] or self._request_key(messages),
+            lambda: self._request(messages, response_schema, cache_token),
+        )
+
+    def _request(
+        self,
+        messages: List[Dict[str, Any]],
+        response_schema: Optional[Dict[str, Any]],
+        cache_token: Tuple[Optional[str], Any],
+    ) -> Dict[str, Any]:
+        """Call the OpenAI API and parse (and cache) the response."""
+        content = self._call_api(messages, response_schema, use_json_format=True)
         try:
-            messages = []
-            if system_prompt:
-                messages.append({"role": "system", "content": system_prompt})
-            
-            # Enhance prompt to request JSON if model doesn't support response_format
-            user_prompt = prompt
-            if not self.supports_json_format:
-                user_prompt = prompt + "\n\nIMPORTANT: Respond ONLY with valid JSON. Do not include any markdown formatting or explanatory text."
-            
-            messages.append({"role": "user", "content": user_prompt})
-
-            # Build request parameters
-            request_params = {
-                "model": self.model,
-                "messages": messages,
-                "temperature": 0.1,  # Low temperature for consistent analysis
-            }
-            
-            # Only add response_format for supported models
-            if self.supports_json_format:
-                request_params["response_format"] = {"type": "json_object"}
-            else:
-                logger.debug(f"Model {self.model} doesn't support response_format, requesting JSON in prompt")
+            result = _parse_json_with_fallback(content)
+        except json.JSONDecodeError as e:
+            logger.error(f"All JSON parsing strategies failed: {e}")
+            logger.debug(f"Full response content length: {len(content)}")
+            # Log a snippet around the error location
+            if e.pos < len(content):
+                start = max(0, e.pos - 100)
+                end = min(len(content), e.pos + 100)
+                logger.debug(f"Content around error position {e.pos}: {content[start:end]}")
+            raise
+        self._cache_store(cache_token, result)
+        return result
+
+    def _call_api(
+        self,
+        messages: List[Dict[str, Any]],
+        response_schema: Optional[Dict[str, Any]],
+        use_json_format: bool,
+    ) -> str:
+        """
+        Call the OpenAI API and return the response text.
+
+        Args:
+            messages: Chat messages
+            response_schema: Optional JSON schema for Structured Outputs
+            use_json_format: Whether to request JSON via response_format; retried
+                without it if the model rejects the parameter
 
+        Returns:
+            Response message content
+        """
+        request_params = self._build_openai_params(
+            messages, include_response_format=use_json_format, response_schema=response_schema
+        )
+        if use_json_format and "response_format" not in request_params:
+            logger.debug(f"Model {self.model} doesn't support response_format, requesting JSON in prompt")
+
+        try:
             logger.debug(f"Calling OpenAI API with model {self.model}...")
             response = self.client.chat.completions.create(**request_params)
             logger.debug("OpenAI API call completed")
-
-            content = response.choices[0].message.content
-            return _parse_json_with_fallback(content)
-
-        except json.JSONDecodeError as e:
-            logger.warning(f"Initial JSON parse failed: {e}")
-            logger.debug(f"Response content (first 500 chars): {content[:500]}")
-            # Try fallback parsing (which includes escape fixing)
-            try:
-                result = _parse_json_with_fallback(content)
-                logger.debug("Fallback parsing succeeded")
-                return result
-            except json.JSONDecodeError as fallback_error:
-                logger.error(f"All JSON parsing strategies failed. Original: {e}, Fallback: {fallback_error}")
-                logger.debug(f"Full response content length: {len(content)}")
-                # Log a snippet around the error location if possible
-                if hasattr(e, 'pos') and e.pos < len(content):
-                    start = max(0, e.pos - 100)
-                    end = min(len(content), e.pos + 100)
-                    logger.debug(f"Content around error position {e.pos}: {content[start:end]}")
-                raise
         except Exception as e:
-            # If error is about response_format, retry without it
-            error_str = str(e)
-            if "response_format" in error_str.lower() and self.supports_json_format:
+            # openai.BadRequestError carries the rejected parameter in .param
+            if "response_format" in request_params and (
+                getattr(e, "param", None) == "response_format"
+                or "response_format" in str(e).lower()
+            ):
                 logger.warning(f"Model {self.model} reported response_format error, retrying without it")
-                # Retry without response_format
-                try:
-                    request_params = {
-                        "model": self.model,
-                        "messages": messages,
-                        "temperature": 0.1,
-                    }
-                    logger.debug(f"Retrying OpenAI API call without response_format...")
-                    response = self.client.chat.completions.create(**request_params)
-                    logger.debug("OpenAI API retry completed")
-                    content = response.choices[0].message.content
-                    # Try to parse JSON with fallback strategies
-                    return _parse_json_with_fallback(content)
-                except Exception as retry_error:
-                    logger.error(f"Retry also failed: {retry_error}")
-                    raise
+                return self._call_api(messages, response_schema, use_json_format=False)
             logger.error(f"OpenAI API error: {e}")
             raise
+        return response.choices[0].message.content
+
+
+@functools.lru_cache(maxsize=64)
+def _supports_json_format(model: str) -> bool:
+    """Check (memoized per model name) if an OpenAI model supports json_object."""
+    supported = OpenAIProvider.JSON_MODEL_TABLE.get(model)
+    if supported is not None:
+        return supported
+    # Dated realtime/audio snapshots of a supported family don't support it
+    return model.startswith(OpenAIProvider.JSON_SUPPORTED_PREFIXES) and not (
+        "realtime" in model or "audio" in model
+    )
 
 
 class AnthropicProvider(AIProvider):
     """Anthropic Claude API provider."""
 
-    def __init__(self, api_key: Optional[str] = None, model: str = "claude-3-opus-20240229"):
+    max_output_tokens = 4096
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model: str = "claude-3-opus-20240229",
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        http_client: Optional[Any] = None,
+        cache: Optional["LLMCache"] = None,
+        semantic_cache: Optional["SemanticCache"] = None,
+    ):
         """
         Initialize Anthropic provider.
 
         Args:
             api_key: Anthropic API key (or use ANTHROPIC_API_KEY env var)
             model: Model name (e.g., "claude-3-opus-20240229", "claude-3-sonnet-20240229")
+            max_retries: Retries on rate limits, timeouts and transient errors
+            http_client: Shared httpx client (optional, uses the SDK default)
+            cache: Exact-match response cache (optional)
+            semantic_cache: Similarity-based response cache (optional)
         """
+        super().__init__()
         try:
             import anthropic
             # Set timeout on client to prevent hanging (60 seconds)
             self.client = anthropic.Anthropic(
                 api_key=api_key,
                 timeout=60.0,  # 60 second timeout for all requests
+                max_retries=max_retries,
+                http_client=http_client,
             )
             self.model = model
+            self.cache = cache
+            self.semantic_cache = semantic_cache
         except ImportError:
             raise ImportError(
                 "anthropic package is required. Install with: pip install anthropic"
@@ -288,28 +603,81 @@ class AnthropicProvider(AIProvider):
         except Exception as e:
             raise RuntimeError(f"Failed to initialize Anthropic client: {e}")
 
-    def analyze(self, prompt: str, system_prompt: Optional[str] = None) -> Dict[str, Any]:
+    def _build_request_params(
+        self, prompt: str, system_prompt: Optional[str], max_tokens: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Build Messages API parameters for a prompt."""
+        request_params = {
+            "model": self.model,
+            "max_tokens": min(max_tokens or 2000, self.max_output_tokens),
+            "temperature": 0.1,
+            "messages": [{"role": "user", "content": prompt}],
+        }
+        # The system prompt is sent as a separate, cacheable block so
+        # repeated calls share a byte-identical prefix
+        if system_prompt:
+            request_params["system"] = [
+                {"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}
+            ]
+        return request_params
+
+    def analyze(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        response_schema: Optional[Dict[str, Any]] = None,
+        max_tokens: Optional[int] = None,
+        use_semantic_cache: bool = True,
+    ) -> Dict[str, Any]:
         """Analyze using Anthropic API."""
+        request_params = self._build_request_params(prompt, system_prompt, max_tokens)
+
+        # The system prompt is a separate parameter, so add it to the
+        # messages keyed by the exact-match cache (only when one is set)
+        cache_messages = request_params["messages"]
+        if system_prompt and self.cache is not None:
+            cache_messages = [{"role": "system", "content": system_prompt}, *cache_messages]
+        cached, cache_token = self._cache_lookup(cache_messages, prompt, use_semantic_cache)
+        if cached is not None:
+            logger.debug("Using cached Anthropic response")
+            return cached
+
+        return self._coalesce(
+            cache_token[0] or self._request_key(request_params["messages"], system_prompt),
+            lambda: self._request(request_params, response_schema, cache_token),
+        )
+
+    def _request(
+        self,
+        request_params: Dict[str, Any],
+        response_schema: Optional[Dict[str, Any]],
+        cache_token: Tuple[Optional[str], Any],
+    ) -> Dict[str, Any]:
+        """Call the Anthropic API and parse (and cache) the response."""
         try:
-            # Combine system prompt with user prompt
-            full_prompt = prompt
-            if system_prompt:
-                full_prompt = f"{system_prompt}\n\n{prompt}"
+            if response_schema:
+                # Forced tool use returns input matching the schema, already parsed
+                tool_name = response_schema.get("title", "emit_response")
+                request_params["tools"] = [{"name": tool_name, "input_schema": response_schema}]
+                request_params["tool_choice"] = {"type": "tool", "name": tool_name}
 
             logger.debug(f"Calling Anthropic API with model {self.model}...")
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=2000,
-                temperature=0.1,
-                messages=[{"role": "user", "content": full_prompt}],
-            )
+            response = self.client.messages.create(**request_params)
             logger.debug("Anthropic API call completed")
 
+            for block in response.content:
+                if getattr(block, "type", None) == "tool_use":
+                    result = dict(block.input)
+                    self._cache_store(cache_token, result)
+                    return result
+
             content = response.content[0].text
 
             # Try to parse as JSON with fallback strategies
             try:
-                return _parse_json_with_fallback(content)
+                result = _parse_json_with_fallback(content)
+                self._cache_store(cache_token, result)
+                return result
             except json.JSONDecodeError:
                 # If no JSON found, try to parse the text response
                 logger.warning("Anthropic response not in JSON format, attempting to parse")
@@ -325,10 +693,187 @@ class AnthropicProvider(AIProvider):
             raise
 
 
+class LocalLLMProvider(AIProvider):
+    """Local GGUF model provider (llama.cpp), with no network calls."""
+
+    max_output_tokens = 2000
+
+    def __init__(
+        self,
+        model_path: str,
+        n_ctx: int = 4096,
+        n_gpu_layers: int = -1,
+        cache: Optional["LLMCache"] = None,
+        semantic_cache: Optional["SemanticCache"] = None,
+    ):
+        """
+        Initialize local provider.
+
+        Args:
+            model_path: Path to a GGUF model file (e.g. a 7B int4 quantization)
+            n_ctx: Context window size in tokens
+            n_gpu_layers: Layers to offload to the GPU (-1 = all)
+            cache: Exact-match response cache (optional)
+            semantic_cache: Similarity-based response cache (optional)
+        """
+        super().__init__()
+        try:
+            from llama_cpp import Llama
+        except ImportError:
+            raise ImportError(
+                "llama-cpp-python package is required for the local provider. "
+                "Install with: pip install llama-cpp-python"
+            )
+        if not model_path or not os.path.isfile(model_path):
+            raise ValueError(f"Local model file not found: {model_path}")
+        try:
+            # The model is loaded once and reused for every request
+            self.client = Llama(
+                model_path=model_path,
+                n_ctx=n_ctx,
+                n_gpu_layers=n_gpu_layers,
+                n_threads=os.cpu_count(),
+                verbose=False,
+            )
+        except Exception as e:
+            raise RuntimeError(f"Failed to load local model: {e}")
+        self.model = model_path
+        self.cache = cache
+        self.semantic_cache = semantic_cache
+        # A llama.cpp context serves one request at a time
+        self._lock = threading.Lock()
+
+    def analyze(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        response_schema: Optional[Dict[str, Any]] = None,
+        max_tokens: Optional[int] = None,
+        use_semantic_cache: bool = True,
+    ) -> Dict[str, Any]:
+        """Analyze using the local model."""
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "user", "content": prompt})
+
+        cached, cache_token = self._cache_lookup(messages, prompt, use_semantic_cache)
+        if cached is not None:
+            logger.debug("Using cached local model response")
+            return cached
+
+        return self._coalesce(
+            cache_token[0] or self._request_key(messages),
+            lambda: self._request(messages, response_schema, cache_token, max_tokens),
+        )
+
+    def _request(
+        self,
+        messages: List[Dict[str, str]],
+        response_schema: Optional[Dict[str, Any]],
+        cache_token: Tuple[Optional[str], Any],
+        max_tokens: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Run the local model and parse (and cache) its response."""
+        logger.debug(f"Running local model {self.model}...")
+        with self._lock:
+            response = self.client.create_chat_completion(
+                messages=messages,
+                temperature=0.1,
+                max_tokens=min(max_tokens or 2000, self.max_output_tokens),
+                # Constrains sampling to valid (schema-conforming) JSON via
+                # llama.cpp's grammar support
+                response_format=(
+                    {"type": "json_object", "schema": response_schema}
+                    if response_schema
+                    else {"type": "json_object"}
+                ),
+            )
+        logger.debug("Local model call completed")
+
+        result = _parse_json_with_fallback(response["choices"][0]["message"]["content"])
+        self._cache_store(cache_token, result)
+        return result
+
+
+def _lowest_confidence(result: Dict[str, Any]) -> float:
+    """Return the confidence of a response, or the lowest one of a batch response."""
+    if "confidence" in result:
+        items = [result]
+    else:
+        items = result.get("verdicts") or []
+    try:
+        return min(float(item.get("confidence", 0.0)) for item in items) if items else 0.0
+    except (AttributeError, TypeError, ValueError):
+        return 0.0
+
+
+class TieredProvider(AIProvider):
+    """
+    Two-tier provider: a local model answers first and low-confidence
+    results are escalated to a cloud provider.
+    """
+
+    def __init__(self, local: AIProvider, cloud: AIProvider, confidence_threshold: float = 0.8):
+        """
+        Initialize tiered provider.
+
+        Args:
+            local: Cheap provider tried first (typically LocalLLMProvider)
+            cloud: Provider used when the local result is not confident enough
+            confidence_threshold: Minimum local confidence to skip escalation
+        """
+        super().__init__()
+        self.local = local
+        self.cloud = cloud
+        self.confidence_threshold = confidence_threshold
+        self.model = cloud.model
+        # A request must fit whichever tier ends up answering it
+        limits = [p.max_output_tokens for p in (local, cloud) if p.max_output_tokens]
+        self.max_output_tokens = min(limits) if limits else None
+
+    def analyze(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        response_schema: Optional[Dict[str, Any]] = None,
+        max_tokens: Optional[int] = None,
+        use_semantic_cache: bool = True,
+    ) -> Dict[str, Any]:
+        """Analyze locally, escalating to the cloud provider on low confidence."""
+        try:
+            result = self.local.analyze(
+                prompt, system_prompt, response_schema, max_tokens, use_semantic_cache
+            )
+        except Exception as e:
+            logger.debug(f"Local model failed, escalating to cloud provider: {e}")
+            return self.cloud.analyze(
+                prompt, system_prompt, response_schema, max_tokens, use_semantic_cache
+            )
+
+        if _lowest_confidence(result) >= self.confidence_threshold:
+            return result
+        logger.debug("Local model confidence below threshold, escalating to cloud provider")
+        return self.cloud.analyze(
+            prompt, system_prompt, response_schema, max_tokens, use_semantic_cache
+        )
+
+    def close(self) -> None:
+        """Close both tiers."""
+        self.local.close()
+        self.cloud.close()
+
+
 def create_provider(
     provider_name: str,
     api_key: Optional[str] = None,
     model: Optional[str] = None,
+    max_connections: Optional[int] = None,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    cache: Optional["LLMCache"] = None,
+    semantic_cache: Optional["SemanticCache"] = None,
+    local_model: Optional[str] = None,
+    local_confidence_threshold: float = 0.8,
 ) -> AIProvider:
     """
     Factory function to create an AI provider.
@@ -336,20 +881,54 @@ def create_provider(
     Args:
         provider_name: Provider name ("openai", "anthropic", "local")
         api_key: API key (or use environment variables)
-        model: Model name (optional, uses defaults)
+        model: Model name (optional, uses defaults); a GGUF file path for "local"
+        max_connections: Size of a shared connection pool for concurrent
+            requests (optional, uses the SDK default client)
+        max_retries: Retries on rate limits, timeouts and transient errors
+        cache: Exact-match response cache shared by all requests (optional)
+        semantic_cache: Similarity-based response cache (optional)
+        local_model: GGUF model tried before a cloud provider, which then
+            only handles low-confidence results (optional)
+        local_confidence_threshold: Minimum local confidence to skip the cloud
 
     Returns:
         AIProvider instance
     """
-    if provider_name.lower() == "openai":
-        return OpenAIProvider(
+    name = provider_name.lower()
+    if name == "local":
+        return LocalLLMProvider(
+            model_path=model,
+            cache=cache,
+            semantic_cache=semantic_cache,
+        )
+
+    http_client = _create_http_client(max_connections) if max_connections else None
+
+    if name == "openai":
+        provider = OpenAIProvider(
             api_key=api_key or None,
             model=model or "gpt-4",
+            max_retries=max_retries,
+            http_client=http_client,
+            cache=cache,
+            semantic_cache=semantic_cache,
         )
-    elif provider_name.lower() == "anthropic":
-        return AnthropicProvider(
+    elif name == "anthropic":
+        provider = AnthropicProvider(
             api_key=api_key or None,
             model=model or "claude-3-opus-20240229",
+            max_retries=max_retries,
+            http_client=http_client,
+            cache=cache,
+            semantic_cache=semantic_cache,
         )
     else:
         raise ValueError(f"Unknown AI provider: {provider_name}")
+
+    if local_model:
+        provider = TieredProvider(
+            LocalLLMProvider(model_path=local_model),
+            provider,
+            confidence_threshold=local_confidence_threshold,
+        )
+    return provider
@@ -0,0 +1,190 @@
+"""Persistent cache of Semgrep matches for unchanged files."""
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# orjson is optional; it speeds up (de)serializing cached matches
+try:
+    import orjson
+
+    _loads = orjson.loads
+
+    def _dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+
+except ImportError:
+    _loads = json.loads
+    _dumps = json.dumps
+
+# Default location of the finding cache
+DEFAULT_FINDING_CACHE_PATH = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "truscan",
+    "findings",
+    "matches.sqlite",
+)
+
+# Entries not rewritten for this long are pruned (e.g. files since deleted)
+MAX_ENTRY_AGE = 30 * 24 * 60 * 60  # 30 days
+
+# Files larger than this are hashed through a memory map instead of a read()
+_MMAP_THRESHOLD = 1 << 20  # 1 MiB
+
+
+def rules_fingerprint(rules_dir: str, extra: Iterable[str] = ()) -> str:
+    """
+    Fingerprint the rule set so cached matches are invalidated when it changes.
+
+    Args:
+        rules_dir: Directory (or single file) holding the Semgrep rules
+        extra: Further strings the matches depend on (e.g. Semgrep version
+            and resource limits)
+
+    Returns:
+        Hex digest over the relative paths and contents of all rule files
+        and the extra strings
+    """
+    digest = hashlib.blake2b()
+    for value in extra:
+        digest.update(value.encode())
+        digest.update(b"\0")
+    if os.path.isfile(rules_dir):
+        rule_files = [rules_dir]
+    else:
+        rule_files = sorted(
+            os.path.join(dirpath, name)
+            for dirpath, _, filenames in os.walk(rules_dir)
+            for name in filenames
+            if name.endswith((".yaml", ".yml"))
+        )
+    for rule_file in rule_files:
+        digest.update(os.path.relpath(rule_file, rules_dir).encode())
+        with open(rule_file, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def content_hash(file_path: str) -> Optional[str]:
+    """
+    Hash a file's contents.
+
+    Args:
+        file_path: File to hash
+
+    Returns:
+        Hex digest, or None if the file can't be read
+    """
+    try:
+        with open(file_path, "rb") as f:
+            if os.fstat(f.fileno()).st_size > _MMAP_THRESHOLD:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    return hashlib.blake2b(mapped).hexdigest()
+            return hashlib.blake2b(f.read()).hexdigest()
+    except (OSError, ValueError) as e:
+        logger.debug("Cannot hash %s: %s", file_path, e)
+        return None
+
+
+class FindingCache:
+    """
+    Cache of Semgrep matches per file, validated by content hash and rule
+    set fingerprint.
+
+    A file whose contents and rules haven't changed since the last scan
+    reuses its previous matches instead of being scanned again. Each path
+    holds only its latest entry, so the cache grows with the number of
+    files scanned rather than with every edit or rule change.
+    """
+
+    def __init__(self, fingerprint: str, path: Optional[str] = None):
+        """
+        Initialize finding cache.
+
+        Args:
+            fingerprint: Rule set fingerprint (see rules_fingerprint)
+            path: SQLite database path (defaults to ~/.cache/truscan/findings/)
+        """
+        self.fingerprint = fingerprint
+        self.path = path or DEFAULT_FINDING_CACHE_PATH
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._db: sqlite3.Connection = sqlite3.connect(
+            self.path, isolation_level=None, check_same_thread=False
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        # Superseded layout with one row per (fingerprint, digest, path)
+        self._db.execute("DROP TABLE IF EXISTS matches")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS file_matches("
+            "path TEXT PRIMARY KEY, digest TEXT, fingerprint TEXT, json TEXT, ts INTEGER)"
+        )
+        self._db.execute(
+            "DELETE FROM file_matches WHERE ts < ?", (int(time.time()) - MAX_ENTRY_AGE,)
+        )
+
+    def get(self, file_path: str, digest: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Look up the cached matches of a file.
+
+        Args:
+            file_path: Path of the file as passed to Semgrep
+            digest: Current content hash of the file
+
+        Returns:
+            Semgrep JSON matches (possibly empty), or None on a miss
+        """
+        try:
+            with self._lock:
+                row = self._db.execute(
+                    "SELECT json FROM file_matches WHERE path=? AND digest=? AND fingerprint=?",
+                    (file_path, digest, self.fingerprint),
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.debug("Finding cache lookup failed: %s", e)
+            return None
+        if row is None:
+            return None
+        try:
+            return _loads(row[0])
+        except ValueError as e:
+            logger.debug("Ignoring unreadable finding cache entry: %s", e)
+            return None
+
+    def set_many(self, entries: Iterable[Tuple[str, str, List[Dict[str, Any]]]]) -> None:
+        """
+        Store the matches of scanned files.
+
+        Args:
+            entries: (file_path, digest, matches) tuples
+        """
+        now = int(time.time())
+        try:
+            rows = [
+                (file_path, digest, self.fingerprint, _dumps(matches), now)
+                for file_path, digest, matches in entries
+            ]
+            # One transaction for all rows (committed, or rolled back on error)
+            with self._lock, self._db:
+                self._db.execute("BEGIN")
+                # Replaces the path's previous entry, whatever its digest or fingerprint
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO file_matches(path, digest, fingerprint, json, ts) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.debug("Finding cache write failed: %s", e)
+
+    def close(self) -> None:
+        """Close the underlying database."""
+        self._db.close()
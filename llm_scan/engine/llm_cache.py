@@ -0,0 +1,270 @@
+"""Exact-match and semantic caches for parsed LLM responses."""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Protocol, Tuple
+
+logger = logging.getLogger(__name__)
+
+# orjson is optional; it serializes cache keys several times faster
+try:
+    import orjson
+
+    def _dumps_sorted(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+
+except ImportError:
+
+    def _dumps_sorted(obj: Any) -> bytes:
+        return json.dumps(obj, sort_keys=True).encode("utf-8")
+
+# Default time-to-live for cached responses (24 hours)
+DEFAULT_TTL = 24 * 60 * 60
+
+
+class CacheBackend(Protocol):
+    """Storage used by LLMCache."""
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached value for key, or None."""
+        ...
+
+    def set(self, key: str, value: Dict[str, Any], ttl: Optional[float]) -> None:
+        """Store value under key, expiring after ttl seconds (None = never)."""
+        ...
+
+
+class MemoryBackend:
+    """Thread-safe in-memory LRU backend."""
+
+    def __init__(self, max_size: int = 1024):
+        """
+        Initialize memory backend.
+
+        Args:
+            max_size: Maximum number of entries kept before evicting the oldest
+        """
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[Optional[float], Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Dict[str, Any], ttl: Optional[float]) -> None:
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+class DiskBackend:
+    """Persistent backend built on diskcache."""
+
+    def __init__(self, directory: str):
+        """
+        Initialize disk backend.
+
+        Args:
+            directory: Directory holding the cache files
+        """
+        try:
+            import diskcache
+        except ImportError:
+            raise ImportError(
+                "diskcache package is required for the disk LLM cache. "
+                "Install with: pip install diskcache"
+            )
+        self._cache = diskcache.Cache(directory)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self._cache.get(key)
+
+    def set(self, key: str, value: Dict[str, Any], ttl: Optional[float]) -> None:
+        self._cache.set(key, value, expire=ttl)
+
+
+class LLMCache:
+    """
+    Cache of parsed LLM responses keyed on the exact request.
+
+    Requests are sent with a low temperature, so an identical
+    (model, messages, temperature) request can reuse the earlier response
+    instead of calling the API again.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[CacheBackend] = None,
+        ttl: Optional[float] = DEFAULT_TTL,
+        enabled: bool = True,
+    ):
+        """
+        Initialize LLM cache.
+
+        Args:
+            backend: Storage backend (defaults to an in-memory LRU)
+            ttl: Seconds before an entry expires (None = never)
+            enabled: Whether lookups and writes are performed
+        """
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.ttl = ttl
+        self.enabled = enabled
+
+    @staticmethod
+    def cache_key(model: str, messages: List[Dict[str, Any]], temperature: float) -> str:
+        """
+        Compute the cache key for a request.
+
+        Args:
+            model: Model name
+            messages: Chat messages sent to the model
+            temperature: Sampling temperature
+
+        Returns:
+            Hex digest identifying the request
+        """
+        return hashlib.sha256(
+            _dumps_sorted({"model": model, "messages": messages, "temperature": temperature})
+        ).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached response for key, or None on a miss."""
+        if not self.enabled:
+            return None
+        try:
+            return self.backend.get(key)
+        except Exception as e:
+            logger.debug(f"LLM cache read failed: {e}")
+            return None
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        """Store a parsed response under key."""
+        if not self.enabled:
+            return
+        try:
+            self.backend.set(key, value, self.ttl)
+        except Exception as e:
+            logger.debug(f"LLM cache write failed: {e}")
+
+
+class SemanticCache:
+    """
+    Cache of parsed LLM responses keyed on prompt similarity.
+
+    Prompts are embedded locally and compared by cosine similarity, so a
+    near-duplicate prompt (the same pattern in another file) can reuse an
+    earlier response. Requires sentence-transformers and faiss.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.92,
+        model_name: str = "all-MiniLM-L6-v2",
+        path: Optional[str] = None,
+    ):
+        """
+        Initialize semantic cache.
+
+        Args:
+            threshold: Minimum cosine similarity for a cache hit
+            model_name: sentence-transformers embedding model
+            path: Directory to load/save the index from (optional)
+        """
+        try:
+            import faiss
+            from sentence_transformers import SentenceTransformer
+        except ImportError:
+            raise ImportError(
+                "sentence-transformers and faiss are required for the semantic LLM cache. "
+                "Install with: pip install sentence-transformers faiss-cpu"
+            )
+        self.threshold = threshold
+        self.path = path
+        self._faiss = faiss
+        self._model = SentenceTransformer(model_name)
+        self._index = faiss.IndexFlatIP(self._model.get_sentence_embedding_dimension())
+        self._responses: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        if path:
+            self._load(path)
+
+    def embed(self, prompt: str) -> Any:
+        """
+        Embed a prompt as an L2-normalized float32 row vector.
+
+        Args:
+            prompt: Dynamic part of the prompt (without the shared system prompt)
+
+        Returns:
+            numpy array of shape (1, dim)
+        """
+        return self._model.encode([prompt], normalize_embeddings=True).astype("float32")
+
+    def get(self, embedding: Any) -> Optional[Dict[str, Any]]:
+        """Return the response of the most similar cached prompt, or None."""
+        with self._lock:
+            if not self._responses:
+                return None
+            scores, ids = self._index.search(embedding, 1)
+        if scores[0, 0] >= self.threshold:
+            return self._responses[ids[0, 0]]
+        return None
+
+    def set(self, embedding: Any, value: Dict[str, Any]) -> None:
+        """Store a parsed response for an embedded prompt."""
+        with self._lock:
+            self._index.add(embedding)
+            self._responses.append(value)
+
+    def save(self, path: Optional[str] = None) -> None:
+        """
+        Persist the index and its responses.
+
+        Args:
+            path: Target directory (defaults to the path given at init)
+        """
+        path = path or self.path
+        if not path:
+            return
+        os.makedirs(path, exist_ok=True)
+        with self._lock:
+            self._faiss.write_index(self._index, os.path.join(path, "index.faiss"))
+            with open(os.path.join(path, "responses.jsonl"), "w", encoding="utf-8") as f:
+                for response in self._responses:
+                    f.write(json.dumps(response) + "\n")
+
+    def _load(self, path: str) -> None:
+        """Load a previously saved index, if present."""
+        index_path = os.path.join(path, "index.faiss")
+        responses_path = os.path.join(path, "responses.jsonl")
+        if not (os.path.exists(index_path) and os.path.exists(responses_path)):
+            return
+        try:
+            index = self._faiss.read_index(index_path)
+            with open(responses_path, "r", encoding="utf-8") as f:
+                responses = [json.loads(line) for line in f if line.strip()]
+        except Exception as e:
+            logger.warning(f"Could not load semantic LLM cache from {path}: {e}")
+            return
+        if index.ntotal != len(responses) or index.d != self._index.d:
+            logger.warning(f"Ignoring inconsistent semantic LLM cache at {path}")
+            return
+        self._index = index
+        self._responses = responses
@@ -1,50 +1,271 @@
-"""Semgrep engine implementation using Python SDK."""
+"""Semgrep engine implementation using the Semgrep CLI."""
 
+import fnmatch
+import itertools
 import json
 import logging
+import operator
 import os
+import re
+import shutil
+import signal
+import subprocess
 import sys
+import threading
 import time
-from io import StringIO
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 
+# orjson is optional; it decodes Semgrep's JSON report several times faster
 try:
-    from semgrep.config_resolver import Config
-    from semgrep.core_output import core as core_output
-    from semgrep.target_manager import TargetManager
-    from semgrep.types import SemgrepError
+    import orjson
+
+    _loads = orjson.loads
 except ImportError:
-    # Fallback for different Semgrep versions
-    try:
-        import semgrep
-        from semgrep import core_runner
-        from semgrep.config_resolver import Config
-        from semgrep.target_manager import TargetManager
-    except ImportError:
-        raise ImportError(
-            "semgrep package is required. Install with: pip install semgrep"
-        )
+    _loads = json.loads
+
+# ijson is optional; it streams matches out of Semgrep's JSON output instead of
+# loading the whole document into memory
+try:
+    import ijson
+except ImportError:
+    ijson = None
 
 from ..config import ScanConfig
 from ..models import Category, DataflowStep, Finding, Location, Severity
+from . import finding_cache
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on Semgrep workers; each needs its own memory, and running out
+# of memory can make Semgrep silently report no findings
+_MAX_JOBS = 8
+_MEMORY_PER_JOB = 1 << 30  # 1 GiB
+
+# Sharded scans run one Semgrep process per this many files, up to _MAX_SHARDS
+_FILES_PER_SHARD = 200
+_MAX_SHARDS = 4
+
+# Most files passed to one Semgrep process; larger scans are split into
+# batches to keep the command line and each process's memory bounded
+_MAX_FILES_PER_BATCH = 1000
+
+# What Semgrep reports as a match's source lines when not logged in
+_REDACTED_LINES = "requires login"
+
+# Directories never scanned (hidden directories are skipped as well)
+_DEFAULT_EXCLUDE_DIRS = frozenset({
+    '__pycache__', 'node_modules', 'venv', 'env', 'build', 'dist',
+    'htmlcov', 'site-packages',
+})
+
+
+def _compile_exclude_patterns(patterns: List[str]) -> Optional["re.Pattern[str]"]:
+    """
+    Compile glob exclude patterns into a single regex.
+
+    Args:
+        patterns: Glob patterns (e.g. "**/tests/**")
+
+    Returns:
+        Compiled alternation of all patterns, or None if there are none
+    """
+    if not patterns:
+        return None
+    # Like fnmatch, match with the platform's path conventions: on Windows
+    # normcase turns "/" into "\\" in the patterns, and IGNORECASE stands in for
+    # normcasing every path
+    flags = re.IGNORECASE if os.path.normcase("A") == "a" else 0
+    return re.compile(
+        "|".join(fnmatch.translate(os.path.normcase(pattern)) for pattern in patterns), flags
+    )
+
+
+def _available_memory() -> Optional[int]:
+    """Return MemAvailable from /proc/meminfo in bytes, or None if unknown."""
+    try:
+        with open("/proc/meminfo", "rb") as f:
+            for line in f:
+                if line.startswith(b"MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def _match_order(match: dict) -> tuple:
+    """Sort key putting Semgrep CLI matches in (path, line, column, rule) order."""
+    start = match.get("start") or {}
+    return (match.get("path", ""), start.get("line", 0), start.get("col", 0), match.get("check_id", ""))
+
+
+def _kill(proc: subprocess.Popen) -> None:
+    """Kill a semgrep process started in its own session, with any children it spawned."""
+    try:
+        if hasattr(os, "killpg"):
+            os.killpg(proc.pid, signal.SIGKILL)
+        else:
+            proc.kill()
+    except (ProcessLookupError, PermissionError):
+        # Already exited
+        pass
+
+
+def _decode(data: bytes) -> str:
+    """Decode subprocess output for logging."""
+    return data.decode("utf-8", errors="replace")
+
+
+def _parse_report(output: bytes) -> dict:
+    """
+    Parse Semgrep's JSON report.
+
+    The output is parsed as is first. Only if that fails (Semgrep may print
+    warnings around the JSON) is it trimmed to the outermost braces and
+    parsed again.
+
+    Raises:
+        ValueError: If no JSON report can be parsed from the output
+    """
+    try:
+        return _loads(output)
+    except ValueError:
+        json_start = output.find(b'{')
+        json_end = output.rfind(b'}') + 1
+        if json_start < 0 or json_end <= json_start:
+            raise
+    logger.debug("Extracted JSON at %s..%s of %s bytes", json_start, json_end, len(output))
+    return _loads(output[json_start:json_end])
+
+
+def _subprocess_error(message: str) -> dict:
+    """
+    Error entry for a failed Semgrep run.
+
+    Its type marks the whole run as failed, so its (missing) matches are not
+    stored in the finding cache.
+    """
+    return {
+        "code": 1,
+        "level": "error",
+        "message": message,
+        "type": "SubprocessError",
+        "path": "",
+    }
+
+
+def _exit_error(returncode: Optional[int]) -> Optional[dict]:
+    """Error entry if Semgrep exited abnormally (0 = no findings, 1 = findings)."""
+    if returncode in (0, 1):
+        return None
+    logger.warning("Semgrep exited with code %s", returncode)
+    return _subprocess_error(f"Semgrep exited with code {returncode}")
+
+
+def _collect_errors(events: Iterator[tuple], errors_list: list) -> Iterator[tuple]:
+    """
+    Pass ijson parse events through, diverting the top-level "errors" array.
+
+    Lets a single pass over Semgrep's report stream the matches while still
+    collecting its errors.
+
+    Args:
+        events: ijson.parse events
+        errors_list: List the parsed errors are appended to
+
+    Yields:
+        All events outside the "errors" array
+    """
+    builder = None
+    for prefix, event, value in events:
+        if builder is not None:
+            builder.event(event, value)
+            if prefix == 'errors' and event == 'end_array':
+                errors_list.extend(builder.value)
+                builder = None
+        elif prefix == 'errors' and event == 'start_array':
+            builder = ijson.ObjectBuilder()
+            builder.event(event, value)
+        else:
+            yield prefix, event, value
+
+
+def _iter_py_files(root: str, exclude_re: Optional["re.Pattern[str]"]) -> Iterator[str]:
+    """
+    Walk a directory tree yielding Python files.
+
+    Excluded and hidden directories are pruned before they are descended
+    into, so their contents are never listed.
+
+    Args:
+        root: Directory to walk
+        exclude_re: Compiled exclude patterns, searched against each path
+            (directories with a trailing separator)
+
+    Yields:
+        Paths of .py files under root
+    """
+    stack = [root]
+    while stack:
+        current_dir = stack.pop()
+        try:
+            with os.scandir(current_dir) as entries:
+                for entry in entries:
+                    name = entry.name
+                    # is_dir()/is_file() are answered from the directory listing
+                    # (each is called at most once per entry)
+                    if entry.is_dir(follow_symlinks=False):
+                        if (
+                            name.startswith('.')
+                            or name in _DEFAULT_EXCLUDE_DIRS
+                            or name.endswith('.egg-info')
+                            or (
+                                exclude_re
+                                and (
+                                    exclude_re.search(entry.path)
+                                    or exclude_re.search(entry.path + os.sep)
+                                )
+                            )
+                        ):
+                            continue
+                        stack.append(entry.path)
+                    elif (
+                        name.endswith('.py')
+                        and not name.startswith('.')
+                        and entry.is_file(follow_symlinks=False)
+                    ):
+                        if exclude_re and exclude_re.search(entry.path):
+                            continue
+                        yield entry.path
+        except OSError as e:
+            logger.debug("Cannot scan directory %s: %s", current_dir, e)
+
+
+@dataclass(slots=True)
+class MatchResults:
+    """Matches and errors reported by a Semgrep run."""
+
+    matches: Iterable[dict]  # list, or an iterator when streamed from Semgrep's output
+    errors: List[dict]
+
 
 class SemgrepEngine:
-    """Engine that uses Semgrep Python SDK to scan code."""
+    """Engine that runs the Semgrep CLI to scan code."""
 
     # Mapping from Semgrep severity to our Severity enum
-    SEVERITY_MAP = {
+    # (keys are interned, as are the strings looked up in _iter_converted, so
+    # lookups hit the cached hash and identity comparison)
+    SEVERITY_MAP = {sys.intern(k): v for k, v in {
         "ERROR": Severity.CRITICAL,
         "WARNING": Severity.HIGH,
         "INFO": Severity.MEDIUM,
         "INVENTORY": Severity.LOW,
-    }
+    }.items()}
 
     # Mapping from rule IDs to categories
-    CATEGORY_MAP = {
+    CATEGORY_MAP = {sys.intern(k): v for k, v in {
         "llm-code-injection": Category.CODE_INJECTION,
         "llm-command-injection": Category.COMMAND_INJECTION,
         "llm-prompt-injection": Category.PROMPT_INJECTION,
@@ -66,13 +287,51 @@ class SemgrepEngine:
         "llm-subprocess-direct": Category.COMMAND_INJECTION,
         "llm-os-system-direct": Category.COMMAND_INJECTION,
         "test-eval": Category.CODE_INJECTION,
-    }
+    }.items()}
+
+    # Rule ID fragments naming a category, for rules not in CATEGORY_MAP
+    # (e.g. "openai-code-injection-eval"), checked in order
+    _CATEGORY_FAMILIES = (
+        ("code-injection", Category.CODE_INJECTION),
+        ("command-injection", Category.COMMAND_INJECTION),
+        ("prompt-injection", Category.PROMPT_INJECTION),
+        ("data-exposure", Category.DATA_EXPOSURE),
+        ("data-exfiltration", Category.DATA_EXPOSURE),
+        ("deserialization", Category.INSECURE_DESERIALIZATION),
+    )
+
+    # Path of the semgrep executable (looked up on PATH once)
+    _semgrep_path: Optional[str] = None
+
+    # Whether the installed semgrep CLI accepts --use-parsing-cache (probed once)
+    _parsing_cache_flag_supported: Optional[bool] = None
+    _semgrep_version_str: Optional[str] = None
 
     def __init__(self, config: ScanConfig):
         """Initialize the Semgrep engine."""
         self.config = config
         self.rules_dir = config.resolve_rules_dir()
-        logger.debug(f"SemgrepEngine initialized with rules_dir: {self.rules_dir}")
+        # Exclude globs compiled once into a single regex
+        self._exclude_re = _compile_exclude_patterns(config.exclude_patterns)
+        self._finding_cache = self._open_finding_cache()
+        # Rule selection as sets, so each check is O(1)
+        self._enabled_rules = frozenset(config.enabled_rules) if config.enabled_rules else None
+        self._disabled_rules = frozenset(config.disabled_rules or ())
+        # Category resolved per rule ID (see _category)
+        self._category_cache: Dict[str, Category] = {}
+        logger.debug("SemgrepEngine initialized with rules_dir: %s", self.rules_dir)
+
+    def close(self) -> None:
+        """Close the finding cache."""
+        if self._finding_cache is not None:
+            self._finding_cache.close()
+            self._finding_cache = None
+
+    def __enter__(self) -> "SemgrepEngine":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
 
     def scan(self) -> List[Finding]:
         """
@@ -81,28 +340,155 @@ class SemgrepEngine:
         Returns:
             List of Finding objects
         """
-        logger.debug(f"Starting scan with rules_dir: {self.rules_dir}")
+        scan_start = time.time()
+        findings = list(self.iter_findings())
+        logger.debug("Scan produced %s finding(s) in %.2fs", len(findings), time.time() - scan_start)
+        return findings
+
+    def iter_findings(self) -> Iterator[Finding]:
+        """
+        Run Semgrep scan and yield normalized findings.
+
+        Findings are converted as Semgrep's matches are read (streamed when
+        ijson is installed), so consumers such as an uploader don't need to
+        hold all of them in memory.
+
+        Yields:
+            Finding objects
+        """
+        logger.debug("Starting scan with rules_dir: %s", self.rules_dir)
         if not os.path.exists(self.rules_dir):
-            logger.error(f"Rules directory not found: {self.rules_dir}")
+            logger.error("Rules directory not found: %s", self.rules_dir)
             raise ValueError(f"Rules directory not found: {self.rules_dir}")
 
-        # Run Semgrep scan using Python SDK
+        # Run Semgrep scan
         logger.debug("Running Semgrep scan...")
         scan_start = time.time()
         results = self._run_semgrep()
-        scan_duration = time.time() - scan_start
-        logger.debug(f"Semgrep scan completed in {scan_duration:.2f}s")
+        logger.debug("Semgrep started in %.2fs", time.time() - scan_start)
 
         # Convert Semgrep results to our Finding model
         logger.debug("Converting Semgrep results to Finding objects...")
-        convert_start = time.time()
-        findings = self._convert_results(results)
-        convert_duration = time.time() - convert_start
-        logger.debug(f"Converted {len(findings)} finding(s) in {convert_duration:.2f}s")
+        yield from self._iter_converted(results)
 
-        return findings
+    def _open_finding_cache(self) -> Optional[finding_cache.FindingCache]:
+        """Open the cache of per-file matches, keyed to the current rule set."""
+        if not self.config.enable_finding_cache or not os.path.exists(self.rules_dir):
+            return None
+        try:
+            # Matches depend on the engine and its limits as well as the rules
+            fingerprint = finding_cache.rules_fingerprint(
+                self.rules_dir, extra=[self._semgrep_version(), *self._limit_args()]
+            )
+            cache = finding_cache.FindingCache(fingerprint)
+        except Exception as e:
+            logger.warning("Could not open finding cache, scanning all files: %s", e)
+            return None
+        logger.debug("Using finding cache: %s", cache.path)
+        return cache
 
-    def _run_semgrep(self):
+    @classmethod
+    def _semgrep_bin(cls) -> str:
+        """
+        Resolve the semgrep executable once per process.
+
+        Falls back to the bare name (so a missing semgrep still fails with
+        FileNotFoundError when run) and doesn't cache the miss.
+        """
+        if cls._semgrep_path is None:
+            path = shutil.which('semgrep')
+            if path is None:
+                return 'semgrep'
+            cls._semgrep_path = path
+        return cls._semgrep_path
+
+    @classmethod
+    def _semgrep_version(cls) -> str:
+        """Semgrep's version (probed once per process), or "unknown"."""
+        if cls._semgrep_version_str is None:
+            try:
+                version_result = subprocess.run(
+                    [cls._semgrep_bin(), '--version'],
+                    stdin=subprocess.DEVNULL,
+                    capture_output=True,
+                    text=True,
+                    timeout=30,
+                )
+                cls._semgrep_version_str = version_result.stdout.strip() or "unknown"
+            except (subprocess.TimeoutExpired, OSError) as e:
+                logger.debug("Could not probe semgrep version: %s", e)
+                return "unknown"
+        return cls._semgrep_version_str
+
+    @classmethod
+    def _supports_parsing_cache_flag(cls) -> bool:
+        """Check (once per process) if the semgrep CLI has --use-parsing-cache."""
+        if cls._parsing_cache_flag_supported is None:
+            try:
+                help_result = subprocess.run(
+                    [cls._semgrep_bin(), 'scan', '--help'],
+                    stdin=subprocess.DEVNULL,
+                    capture_output=True,
+                    text=True,
+                    timeout=30,
+                )
+                cls._parsing_cache_flag_supported = '--use-parsing-cache' in help_result.stdout
+            except (subprocess.TimeoutExpired, OSError) as e:
+                logger.debug("Could not probe semgrep for --use-parsing-cache: %s", e)
+                cls._parsing_cache_flag_supported = False
+        return cls._parsing_cache_flag_supported
+
+    def _parse_cache_args(self, env: dict) -> List[str]:
+        """
+        Enable Semgrep's parsing cache for this run.
+
+        Parsed ASTs are keyed by file content, so unchanged files are not
+        re-parsed on the next scan.
+
+        Args:
+            env: Environment for the semgrep subprocess (updated in place when
+                the CLI flag is unavailable)
+
+        Returns:
+            Extra semgrep command-line arguments
+        """
+        if not self.config.enable_parse_cache:
+            return []
+        cache_dir = (
+            Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "truscan" / "semgrep"
+        )
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            logger.debug("Parsing cache disabled, cannot create %s: %s", cache_dir, e)
+            return []
+        if self._supports_parsing_cache_flag():
+            return ['--use-parsing-cache', str(cache_dir)]
+        env["SEMGREP_USE_PARSING_CACHE"] = str(cache_dir)
+        return []
+
+    def _limit_args(self) -> List[str]:
+        """
+        Semgrep's own resource limits.
+
+        These bound memory and time per file, so one pathological file is
+        skipped instead of exhausting memory or hitting the overall timeout.
+        """
+        return [
+            '--max-memory', str(self.config.semgrep_max_memory),
+            '--timeout', str(self.config.semgrep_timeout),
+            '--timeout-threshold', str(self.config.semgrep_timeout_threshold),
+        ]
+
+    def _jobs(self) -> int:
+        """Number of Semgrep worker processes to run."""
+        jobs = min(self.config.jobs or os.cpu_count() or 1, _MAX_JOBS)
+        available = _available_memory()
+        if available is not None:
+            jobs = max(1, min(jobs, available // _MEMORY_PER_JOB))
+        return jobs
+
+    def _run_semgrep(self) -> MatchResults:
         """
         Execute Semgrep scan using subprocess (CLI).
 
@@ -111,428 +497,646 @@ class SemgrepEngine:
         requires a Click context which causes "I/O operation on closed file" errors.
         Therefore, we use the subprocess approach to call semgrep CLI directly.
         """
-        # Define MatchResults class early
-        class MatchResults:
-            def __init__(self, matches, errors):
-                self.matches = matches
-                self.errors = errors
-
         # Find target files manually
         logger.debug("Finding target files...")
         target_file_paths = []
+
+        # Make each root absolute once; walked paths are joined onto it, so
+        # they are absolute by construction
+        roots = [os.path.abspath(path) for path in self.config.paths]
+        dirs = [root for root in roots if os.path.isdir(root)]
+        # Literal .py targets are passed through without another stat; if one
+        # doesn't exist, Semgrep reports it
+        dir_set = set(dirs)
+        target_file_paths.extend(
+            root for root in roots if root.endswith('.py') and root not in dir_set
+        )
+        for root in dirs:
+            target_file_paths.extend(_iter_py_files(root, self._exclude_re))
         
-        # Common directories to exclude
-        default_exclude_dirs = {
-            '__pycache__', 'node_modules', '.venv', 'venv', 'env', '.env',
-            'build', 'dist', '.git', '.pytest_cache', '.mypy_cache', '.tox',
-            'htmlcov', 'site-packages', '.eggs', '*.egg-info'
-        }
-        
-        for path in self.config.paths:
-            path_obj = Path(path)
-            if path_obj.is_file() and path_obj.suffix == '.py':
-                target_file_paths.append(str(path_obj.absolute()))
-            elif path_obj.is_dir():
-                for py_file in path_obj.rglob("*.py"):
-                    # Skip if in excluded directory
-                    parts = py_file.parts
-                    if any(excluded in parts for excluded in default_exclude_dirs):
-                        continue
-                    
-                    # Check exclude patterns
-                    if self.config.exclude_patterns:
-                        file_str = str(py_file)
-                        if any(
-                            py_file.match(pattern) or 
-                            pattern in file_str or
-                            any(part in pattern for part in py_file.parts)
-                            for pattern in self.config.exclude_patterns
-                        ):
-                            continue
-                    target_file_paths.append(str(py_file.absolute()))
-        
-        logger.info(f"Found {len(target_file_paths)} Python file(s) to scan")
-        for f in target_file_paths:
-            logger.info(f"  → Scanning: {f}")
+        logger.info("Found %s Python file(s) to scan", len(target_file_paths))
+        # Check the level once rather than per file, which adds up on large trees
+        if logger.isEnabledFor(logging.INFO):
+            for f in target_file_paths:
+                logger.info("  → Scanning: %s", f)
         
         if not target_file_paths:
             logger.warning("No Python files found to scan")
             return MatchResults(matches=[], errors=[])
-        
-        # Limit files per batch to avoid command line length issues
-        # Semgrep can handle large file lists, but very large lists can cause issues
-        max_files_per_batch = 1000
-        if len(target_file_paths) > max_files_per_batch:
-            logger.warning(f"Large number of files ({len(target_file_paths)}). This may take a while...")
-            logger.info(f"Scanning in batches of {max_files_per_batch} files")
 
+        if self._finding_cache is None:
+            return self._invoke_semgrep(target_file_paths)
+
+        # Only scan files whose contents (or the rules) changed since the last scan
+        cached_matches = []
+        pending = {}  # file path -> content hash, for files to scan
+        scan_paths = []
+        for file_path in target_file_paths:
+            digest = finding_cache.content_hash(file_path)
+            hit = self._finding_cache.get(file_path, digest) if digest else None
+            if hit is None:
+                scan_paths.append(file_path)
+                if digest:
+                    pending[file_path] = digest
+            else:
+                cached_matches.extend(hit)
+        logger.info(
+            "Finding cache: %d unchanged file(s), scanning %d",
+            len(target_file_paths) - len(scan_paths),
+            len(scan_paths),
+        )
+        if not scan_paths:
+            return MatchResults(matches=cached_matches, errors=[])
+
+        results = self._invoke_semgrep(scan_paths)
+        return MatchResults(
+            matches=self._record_matches(results, pending, cached_matches),
+            errors=results.errors,
+        )
+
+    def _record_matches(self, results: MatchResults, pending: dict, cached_matches: list) -> Iterator[dict]:
+        """
+        Yield fresh and cached matches, storing the fresh ones in the finding cache.
+
+        Args:
+            results: MatchResults of the Semgrep run over the pending files
+            pending: Content hash of each scanned file
+            cached_matches: Matches reused from the cache
+
+        Yields:
+            Semgrep JSON matches
+        """
+        buckets = {file_path: [] for file_path in pending}
+        attributed = True
+        for match in results.matches:
+            bucket = None
+            if isinstance(match, dict) and match.get("path"):
+                bucket = buckets.get(match["path"])
+                if bucket is None:
+                    bucket = buckets.get(os.path.abspath(match["path"]))
+            if bucket is None:
+                attributed = False
+            else:
+                bucket.append(match)
+            yield match
+        yield from cached_matches
+
+        # The errors list is complete once the matches are exhausted
+        failed = set()
+        for err in results.errors:
+            if err.get("type") == "SubprocessError":
+                return
+            if err.get("path"):
+                failed.add(os.path.abspath(err["path"]))
+        if not attributed:
+            # A match we couldn't tie to a scanned file: caching would drop it
+            logger.debug("Not updating finding cache: unattributed Semgrep match")
+            return
+        self._finding_cache.set_many(
+            (file_path, pending[file_path], matches)
+            for file_path, matches in buckets.items()
+            if file_path not in failed
+        )
+
+    def _invoke_semgrep(self, target_file_paths: List[str]) -> MatchResults:
+        """
+        Run the semgrep CLI on target files.
+
+        Args:
+            target_file_paths: Absolute paths of the files to scan
+
+        Returns:
+            MatchResults of the run
+        """
+        jobs = self._jobs()
+        shard_count = 1
+        if self.config.sharded_scan:
+            shard_count = min(_MAX_SHARDS, max(1, len(target_file_paths) // _FILES_PER_SHARD))
+        # Never hand one process more than _MAX_FILES_PER_BATCH files
+        shard_count = max(shard_count, -(-len(target_file_paths) // _MAX_FILES_PER_BATCH))
+        if shard_count == 1:
+            return self._run_semgrep_process(target_file_paths, jobs)
+
+        # Round-robin so each shard gets a similar mix of files
+        shards = [target_file_paths[i::shard_count] for i in range(shard_count)]
+        # Share the job budget so the shards together stay within the memory cap
+        workers = min(shard_count, jobs)
+        shard_jobs = max(1, jobs // workers)
+        if len(target_file_paths) > _MAX_FILES_PER_BATCH:
+            logger.warning("Large number of files (%s). This may take a while...", len(target_file_paths))
+        logger.info("Running %s Semgrep shard(s), %s at a time", shard_count, workers)
+
+        def run_shard(shard: List[str]):
+            results = self._run_semgrep_process(shard, shard_jobs)
+            # Consume streamed matches here so the shard's process is reaped
+            return list(results.matches), results.errors
+
+        matches = []
+        errors_list = []
+        # Threads suffice: the work happens in the semgrep processes. map()
+        # yields in shard order, so the merge doesn't depend on which shard
+        # finishes first
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for shard_matches, shard_errors in executor.map(run_shard, shards):
+                matches.extend(shard_matches)
+                errors_list.extend(shard_errors)
+        # Round-robin sharding interleaves files, so restore a stable order
+        matches.sort(key=_match_order)
+        return MatchResults(matches=matches, errors=errors_list)
+
+    def _run_semgrep_process(self, target_file_paths: List[str], jobs: int) -> MatchResults:
+        """
+        Run one semgrep CLI process on target files.
+
+        Args:
+            target_file_paths: Absolute paths of the files to scan
+            jobs: Value for semgrep --jobs
+
+        Returns:
+            MatchResults of the run (matches may be a lazily parsed iterator)
+        """
         # IMPORTANT: Semgrep's Python SDK doesn't expose a clean programmatic scanning API
         # that works outside of Click context. The SDK's Config.from_config_list() method
         # requires a Click context which causes "I/O operation on closed file" errors.
         # Therefore, we use subprocess to call semgrep CLI directly.
         
         logger.info("Running Semgrep scan using subprocess...")
-        logger.debug(f"Target files: {target_file_paths}")
-        
-        import tempfile
-        import subprocess
-        
-        # Create temporary file for JSON output
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as tmp_file:
-            tmp_json_path = tmp_file.name
+        logger.debug("Target files: %s", target_file_paths)
         
         try:
             # Build semgrep command
             # Use --no-git-ignore to avoid Semgrep's own gitignore handling
             # since we handle it in find_files()
+            env = os.environ.copy()
+            logger.debug("Running semgrep with %s job(s)", jobs)
             cmd = [
-                'semgrep',
+                self._semgrep_bin(),
                 '--config', self.rules_dir,
                 '--json',
                 '--quiet',
+                '--jobs', str(jobs),
+                *self._limit_args(),
                 '--no-git-ignore',
-                '--output', tmp_json_path,
+                *self._parse_cache_args(env),
             ] + target_file_paths
             
-            logger.debug(f"Running semgrep on {len(target_file_paths)} file(s)")
-            logger.debug(f"Command: {' '.join(cmd[:6])}... {len(cmd)-6} more args")
+            logger.debug("Running semgrep on %s file(s)", len(target_file_paths))
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Command: %s... %s more args", ' '.join(cmd[:6]), len(cmd)-6)
             
-            # Run semgrep
-            # capture_output=True captures both stdout and stderr
-            result = subprocess.run(
+            # Run semgrep, reading the JSON report straight from its stdout pipe.
+            # In its own session, so on timeout its whole process group
+            # (including semgrep-core workers) can be killed.
+            proc = subprocess.Popen(
                 cmd,
-                capture_output=True,
-                text=True,
-                timeout=300,  # 5 minute timeout
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                env=env,
+                start_new_session=True,
             )
+            if ijson is not None:
+                return self._stream_results(proc)
+
+            # Output stays bytes: the JSON parsers take bytes directly, and
+            # only the snippets that get logged are decoded
+            try:
+                output, stderr = proc.communicate(timeout=300)  # 5 minute timeout
+            except subprocess.TimeoutExpired:
+                _kill(proc)
+                proc.communicate()
+                raise
             
-            logger.debug(f"Semgrep exit code: {result.returncode}")
-            if result.stderr:
-                logger.debug(f"Semgrep stderr (first 200 chars): {result.stderr[:200]}")
-            
-            # Read JSON output
-            if os.path.exists(tmp_json_path):
-                with open(tmp_json_path, 'r') as f:
-                    output = f.read()
-                logger.debug(f"Read {len(output)} chars from JSON file")
-                os.unlink(tmp_json_path)
-            else:
-                output = result.stdout
-                logger.debug(f"Using stdout, length: {len(output) if output else 0}")
+            logger.debug("Semgrep exit code: %s", proc.returncode)
+            if stderr:
+                logger.debug("Semgrep stderr (first 200 chars): %s", _decode(stderr[:200]))
+            logger.debug("Using stdout, length: %s", len(output))
+            exit_error = _exit_error(proc.returncode)
             
             if output:
-                # Semgrep may output warnings before JSON, so find the JSON part
-                # Look for the first '{' that starts valid JSON
-                json_start = output.find('{')
-                if json_start >= 0:
-                    logger.debug(f"Found JSON start at position {json_start}")
-                    output = output[json_start:]
-                    # Also try to find the last '}' in case there's trailing output
-                    json_end = output.rfind('}') + 1
-                    if json_end > 0:
-                        output = output[:json_end]
-                        logger.debug(f"Extracted JSON, length: {len(output)}")
-                
                 try:
-                    result_data = json.loads(output)
+                    result_data = _parse_report(output)
                     matches = result_data.get('results', [])
                     errors_list = result_data.get('errors', [])
-                    
-                    logger.info(f"Semgrep scan completed, found {len(matches)} match(es)")
+                    if exit_error is not None:
+                        errors_list.append(exit_error)
+
+                    logger.info("Semgrep scan completed, found %s match(es)", len(matches))
                     if errors_list:
-                        logger.warning(f"Semgrep reported {len(errors_list)} error(s)")
+                        logger.warning("Semgrep reported %s error(s)", len(errors_list))
                         for err in errors_list[:3]:  # Log first 3 errors
-                            logger.warning(f"  Rule error: {err.get('message', 'Unknown')} (type: {err.get('type', 'Unknown')})")
+                            logger.warning("  Rule error: %s (type: %s)", err.get('message', 'Unknown'), err.get('type', 'Unknown'))
                     if matches:
-                        logger.info(f"Found {len(matches)} match(es)!")
+                        logger.info("Found %s match(es)!", len(matches))
                         for i, match in enumerate(matches[:3]):  # Log first 3 matches
-                            logger.info(f"  Match {i+1}: {match.get('check_id', 'unknown')} at {match.get('path', 'unknown')}:{match.get('start', {}).get('line', '?')}")
+                            logger.info("  Match %s: %s at %s:%s", i+1, match.get('check_id', 'unknown'), match.get('path', 'unknown'), match.get('start', {}).get('line', '?'))
                     else:
                         logger.warning("No matches found in Semgrep results")
-                        logger.debug(f"Results keys: {list(result_data.keys())}")
-                        logger.debug(f"Results structure: {json.dumps(result_data, indent=2)[:500]}")
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug("Results keys: %s", list(result_data.keys()))
+                            logger.debug("Results structure: %s", json.dumps(result_data, indent=2)[:500])
                     return MatchResults(matches=matches, errors=errors_list)
                 except json.JSONDecodeError as e:
-                    logger.error(f"Failed to parse Semgrep JSON output: {e}")
-                    logger.debug(f"Output (first 1000 chars): {output[:1000]}")
-                    if result.stderr:
-                        logger.debug(f"Semgrep stderr (first 500 chars): {result.stderr[:500]}")
-                    return MatchResults(matches=[], errors=[])
+                    logger.error("Failed to parse Semgrep JSON output: %s", e)
+                    logger.debug("Output (first 1000 chars): %s", _decode(output[:1000]))
+                    if stderr:
+                        logger.debug("Semgrep stderr (first 500 chars): %s", _decode(stderr[:500]))
+                    return MatchResults(
+                        matches=[], errors=[_subprocess_error(f"Unparseable Semgrep output: {e}")]
+                    )
             else:
                 logger.warning("Semgrep returned no output")
-                if result.stderr:
-                    logger.warning(f"Semgrep stderr: {result.stderr[:500]}")
-                return MatchResults(matches=[], errors=[])
+                if stderr:
+                    logger.warning("Semgrep stderr: %s", _decode(stderr[:500]))
+                return MatchResults(
+                    matches=[], errors=[_subprocess_error("Semgrep returned no output")]
+                )
                 
         except (subprocess.TimeoutExpired, FileNotFoundError) as e:
-            logger.error(f"Semgrep subprocess failed: {e}")
-            # Clean up temp file
-            if os.path.exists(tmp_json_path):
-                try:
-                    os.unlink(tmp_json_path)
-                except:
-                    pass
-            return MatchResults(matches=[], errors=[{
-                "code": 1,
-                "level": "error",
-                "message": str(e),
-                "type": "SubprocessError",
-                "path": "",
-            }])
+            logger.error("Semgrep subprocess failed: %s", e)
+            if isinstance(e, FileNotFoundError):
+                logger.error("semgrep is required. Install with: pip install semgrep")
+            return MatchResults(matches=[], errors=[_subprocess_error(str(e))])
         except (json.JSONDecodeError, ValueError) as e:
-            logger.error(f"Failed to parse Semgrep JSON output: {e}")
-            if os.path.exists(tmp_json_path):
-                try:
-                    with open(tmp_json_path, 'r') as f:
-                        logger.debug(f"Output was: {f.read()[:500]}")
-                    os.unlink(tmp_json_path)
-                except:
-                    pass
-            return MatchResults(matches=[], errors=[])
+            logger.error("Failed to parse Semgrep JSON output: %s", e)
+            return MatchResults(
+                matches=[], errors=[_subprocess_error(f"Unparseable Semgrep output: {e}")]
+            )
 
-    def _manual_rule_matching(self, rules, target_file_paths, MatchResults):
+    def _stream_results(self, proc: subprocess.Popen) -> MatchResults:
         """
-        Manual rule matching using Semgrep's rule objects.
-        
-        Since Semgrep's Python SDK doesn't expose a clean API for running scans,
-        we use the Config and rules we've loaded and match them manually.
-        This is a workaround for the limitations of the Semgrep Python SDK.
+        Stream Semgrep results from its stdout with ijson.
+
+        Matches are parsed lazily as _iter_converted consumes them. The
+        errors list is filled in as the report is read, so it is complete
+        once the matches are exhausted.
+
+        Args:
+            proc: Running semgrep process with piped stdout/stderr
+
+        Returns:
+            MatchResults whose matches is an iterator
         """
-        logger.info("Using manual rule matching...")
-        all_matches = []
-        errors = []
-        
-        logger.info(f"Processing {len(rules)} rule(s) against {len(target_file_paths)} file(s)")
+        errors_list = []
+        return MatchResults(matches=self._iter_matches(proc, errors_list), errors=errors_list)
 
-        # Try to use Semgrep's internal matching engine if available
-        try:
-            from semgrep.core_output import core as core_output
-            from semgrep.target_manager import TargetManager
-            
-            # Create a simple target manager for file discovery
-            target_manager = TargetManager(
-                includes=[],
-                excludes={},
-                respect_git_ignore=False,
-                max_target_bytes=1000000,
-                scanning_root_strings=target_file_paths[:1] if target_file_paths else [],
-            )
-            
-            # For each file, try to get matches using Semgrep's internal APIs
-            for file_path in target_file_paths:
-                logger.debug(f"Scanning file: {file_path}")
-                try:
-                    # Try to use Semgrep's rule matching on the file
-                    # This is a simplified approach - we match each rule individually
-                    for rule in rules:
-                        try:
-                            # Check if rule language matches file
-                            file_ext = Path(file_path).suffix
-                            if file_ext == '.py' and 'python' not in rule.languages:
-                                continue
-                            
-                            # Try to match rule - this is the tricky part
-                            # Semgrep rules need to be matched against parsed AST
-                            # We'll create a simple match structure based on pattern matching
-                            # This is a workaround since rule.match() doesn't work as expected
-                            
-                            # For now, we'll skip actual matching and rely on the fact
-                            # that Semgrep CLI would work - but we can't use CLI
-                            # So we'll return empty matches and log a warning
-                            pass
-                        except Exception as e:
-                            logger.debug(f"  Error matching rule {rule.id}: {e}")
-                except Exception as e:
-                    logger.debug(f"  Error processing {file_path}: {e}")
-        except ImportError:
-            logger.debug("Semgrep core_output not available")
-        
-        # Since direct rule matching is complex, we'll use a simpler approach:
-        # Return empty matches for now, but log that we need to use Semgrep CLI
-        # or find a better API
-        logger.warning(
-            "Semgrep Python SDK doesn't provide a clean API for programmatic scanning. "
-            "Consider using Semgrep CLI directly or contributing to Semgrep to expose better APIs."
+    @staticmethod
+    def _iter_matches(proc: subprocess.Popen, errors_list: list) -> Iterator[dict]:
+        """Yield Semgrep matches from the process's stdout, then reap the process."""
+        # Drain stderr concurrently so a full pipe buffer can't block semgrep
+        stderr_chunks = []
+        stderr_thread = threading.Thread(
+            target=lambda: stderr_chunks.append(proc.stderr.read()), daemon=True
         )
-        
-        logger.info(f"Manual matching found {len(all_matches)} total match(es)")
-        return MatchResults(matches=all_matches, errors=errors)
+        stderr_thread.start()
+        timed_out = threading.Event()
+
+        def on_timeout():
+            timed_out.set()
+            _kill(proc)
+
+        timer = threading.Timer(300, on_timeout)  # 5 minute timeout
+        timer.start()
+        try:
+            # Semgrep may output warnings before JSON, so skip to the first '{'
+            # (a buffered chunk at a time, without consuming the '{')
+            stdout = proc.stdout
+            while True:
+                buffered = stdout.peek(1)
+                if not buffered:
+                    break
+                json_start = buffered.find(b'{')
+                if json_start >= 0:
+                    stdout.read(json_start)
+                    break
+                stdout.read(len(buffered))
+            events = _collect_errors(ijson.parse(stdout, use_float=True), errors_list)
+            yield from ijson.items(events, 'results.item')
+        except ijson.JSONError as e:
+            if not timed_out.is_set():
+                logger.error("Failed to parse Semgrep JSON output: %s", e)
+                errors_list.append(_subprocess_error(f"Unparseable Semgrep output: {e}"))
+        finally:
+            timer.cancel()
+            proc.stdout.close()
+            proc.wait()
+            stderr_thread.join()
+
+        logger.debug("Semgrep exit code: %s", proc.returncode)
+        stderr = b"".join(stderr_chunks)
+        if stderr:
+            logger.debug("Semgrep stderr (first 200 chars): %s", _decode(stderr[:200]))
+        if timed_out.is_set():
+            logger.error("Semgrep subprocess failed: timed out after 300 seconds")
+            errors_list.append(_subprocess_error("Semgrep timed out after 300 seconds"))
+        else:
+            exit_error = _exit_error(proc.returncode)
+            if exit_error is not None:
+                errors_list.append(exit_error)
+        if errors_list:
+            logger.warning("Semgrep reported %s error(s)", len(errors_list))
+            for err in errors_list[:3]:  # Log first 3 errors
+                logger.warning("  Rule error: %s (type: %s)", err.get('message', 'Unknown'), err.get('type', 'Unknown'))
+
+    def _rule_selected(self, rule_id: str) -> bool:
+        """
+        Check a rule against the enabled/disabled rule IDs.
+
+        Semgrep prefixes rule IDs with the dotted path of their rules file,
+        so both the full and the bare rule ID are accepted.
+        """
+        short_id = rule_id.rpartition(".")[2]
+        enabled = self._enabled_rules
+        if enabled is not None and rule_id not in enabled and short_id not in enabled:
+            return False
+        disabled = self._disabled_rules
+        return rule_id not in disabled and short_id not in disabled
+
+    def _category(self, rule_id: str) -> Category:
+        """
+        Categorize a rule, caching the result per rule ID.
+
+        Looks up the full and bare rule ID (Semgrep prefixes IDs with the
+        dotted path of their rules file) in CATEGORY_MAP, then the bare ID's
+        family in _CATEGORY_FAMILIES, falling back to Category.OTHER.
+        """
+        category = self._category_cache.get(rule_id)
+        if category is None:
+            short_id = rule_id.rpartition(".")[2]
+            category = self.CATEGORY_MAP.get(rule_id)
+            if category is None:
+                category = self.CATEGORY_MAP.get(short_id)
+            if category is None:
+                category = next(
+                    (cat for family, cat in self._CATEGORY_FAMILIES if family in short_id),
+                    Category.OTHER,
+                )
+            self._category_cache[rule_id] = category
+        return category
 
     def _convert_results(self, results) -> List[Finding]:
         """Convert Semgrep matches to Finding objects."""
+        return list(self._iter_converted(results))
+
+    def _iter_converted(self, results) -> Iterator[Finding]:
+        """Convert Semgrep matches to Finding objects, yielding those that pass the filters."""
         logger.debug("Converting Semgrep matches to Finding objects...")
-        findings = []
 
         # Ensure results.matches exists and is iterable
         if not hasattr(results, "matches") or results.matches is None:
             logger.warning("No matches found in results")
-            return findings
+            return
+
+        # Matches are all JSON dicts (Semgrep CLI) or all match objects, so
+        # pick the converter from the first one rather than per match
+        matches = iter(results.matches)
+        first = next(matches, None)
+        if first is None:
+            logger.info("Converted 0 match(es) to findings, skipped 0")
+            return
+        matches = itertools.chain((first,), matches)
+        if type(first) is dict:
+            converted = self._convert_dict_matches(matches)
+        else:
+            converted = self._convert_object_matches(matches)
 
-        logger.debug(f"Processing {len(results.matches)} match(es)")
-        converted_count = 0
+        # Severity filter as a set, so each check is O(1) (entries normalized
+        # to Severity, as enum members don't hash like their string values)
+        severity_filter = (
+            frozenset(map(Severity, self.config.severity_filter))
+            if self.config.severity_filter
+            else None
+        )
+        rule_selected = (
+            self._rule_selected
+            if self._enabled_rules is not None or self._disabled_rules
+            else None
+        )
+        kept_count = 0
         skipped_count = 0
 
-        for match_idx, match in enumerate(results.matches, 1):
-            if match_idx % 100 == 0:
-                logger.debug(f"Processing match {match_idx}/{len(results.matches)}...")
-            try:
-                # Handle both dict (from JSON) and object matches
-                if isinstance(match, dict):
-                    # JSON match format from Semgrep CLI
-                    # path is a string, not nested
-                    file_path = str(match.get("path", "unknown"))
-                    # start and end are dicts with line, col, offset
-                    start_dict = match.get("start", {})
-                    end_dict = match.get("end", {})
-                    start_line = start_dict.get("line", 1) if isinstance(start_dict, dict) else 1
-                    start_column = start_dict.get("col", 1) if isinstance(start_dict, dict) else 1
-                    end_line = end_dict.get("line", start_line) if isinstance(end_dict, dict) else start_line
-                    end_column = end_dict.get("col", start_column) if isinstance(end_dict, dict) else start_column
-                    rule_id = match.get("check_id", "unknown")
-                    # Message is in extra.message, not directly in match
-                    extra = match.get("extra", {})
-                    message = extra.get("message", rule_id) if isinstance(extra, dict) else rule_id
-                    rule_severity = extra.get("severity", "WARNING") if isinstance(extra, dict) else "WARNING"
+        if severity_filter is None and rule_selected is None:
+            # No filters configured: keep every converted finding
+            for finding in converted:
+                if finding is None:
+                    skipped_count += 1
                 else:
-                    # Object match format
-                    try:
-                        file_path = str(match.path) if hasattr(match, "path") and match.path else "unknown"
-                        start_line = match.start.line if hasattr(match, "start") and match.start else 1
-                        start_column = match.start.col if hasattr(match, "start") and match.start else 1
-                        end_line = match.end.line if hasattr(match, "end") and match.end else start_line
-                        end_column = match.end.col if hasattr(match, "end") and match.end else start_column
-                        rule_id = getattr(match, "rule_id", None) or (getattr(match, "check_id", "unknown"))
-                        message = getattr(match, "message", rule_id)
-                        rule_severity = "WARNING"
-                        if hasattr(match, "extra") and match.extra is not None and isinstance(match.extra, dict):
-                            rule_severity = match.extra.get("severity", "WARNING")
-                    except (AttributeError, TypeError):
-                        # Fallback values if match structure is unexpected
-                        file_path = "unknown"
-                        start_line = 1
-                        start_column = 1
-                        end_line = 1
-                        end_column = 1
-                        rule_id = "unknown"
-                        message = "Unknown match"
-                        rule_severity = "WARNING"
-                
-                location = Location(
-                    file_path=file_path,
-                    start_line=start_line,
-                    start_column=start_column,
-                    end_line=end_line,
-                    end_column=end_column,
-                    snippet=self._extract_snippet(match),
-                )
+                    kept_count += 1
+                    yield finding
+        else:
+            for finding in converted:
+                if finding is None:
+                    skipped_count += 1
+                    continue
 
-                # Map severity
-                severity = self.SEVERITY_MAP.get(rule_severity, Severity.MEDIUM)
-
-                # Map category from rule ID
-                category = self.CATEGORY_MAP.get(rule_id, Category.OTHER)
-
-                # Extract CWE, remediation, and other metadata if available
-                cwe = None
-                remediation = None
-                rule_metadata = {}
-                if isinstance(match, dict):
-                    extra = match.get("extra", {})
-                    if isinstance(extra, dict):
-                        metadata = extra.get("metadata", {})
-                        if isinstance(metadata, dict):
-                            cwe = metadata.get("cwe")
-                            remediation = metadata.get("remediation")
-                            # Extract all metadata fields for AI analysis
-                            rule_metadata = {
-                                "confidence": metadata.get("confidence", "high"),
-                                "description": metadata.get("description"),
-                                "impact": metadata.get("impact"),
-                                "likelihood": metadata.get("likelihood"),
-                            }
-                else:
-                    rule = getattr(match, "rule", None)
-                    if rule and hasattr(rule, "metadata") and rule.metadata is not None and isinstance(rule.metadata, dict):
-                        cwe = rule.metadata.get("cwe")
-                        remediation = rule.metadata.get("remediation")
-                        # Extract all metadata fields for AI analysis
-                        rule_metadata = {
-                            "confidence": rule.metadata.get("confidence", "high"),
-                            "description": rule.metadata.get("description"),
-                            "impact": rule.metadata.get("impact"),
-                            "likelihood": rule.metadata.get("likelihood"),
-                        }
-
-                # Extract dataflow path if available
-                dataflow_path = []
-                try:
-                    if hasattr(match, "extra") and match.extra is not None and isinstance(match.extra, dict):
-                        trace = match.extra.get("dataflow_trace")
-                        if trace is not None and isinstance(trace, dict):
-                            source = trace.get("taint_source")
-                            if source is not None and isinstance(source, dict):
-                                # Safely extract start/end positions
-                                start_dict = source.get("start")
-                                if start_dict is None or not isinstance(start_dict, dict):
-                                    start_dict = {}
-                                end_dict = source.get("end")
-                                if end_dict is None or not isinstance(end_dict, dict):
-                                    end_dict = {}
-                                
-                                dataflow_path.append(
-                                    DataflowStep(
-                                        file_path=str(source.get("path") or match.path),
-                                        start_line=start_dict.get("line") if start_dict else match.start.line,
-                                        start_column=start_dict.get("col") if start_dict else match.start.col,
-                                        end_line=end_dict.get("line") if end_dict else match.end.line,
-                                        end_column=end_dict.get("col") if end_dict else match.end.col,
-                                        message="LLM output source",
-                                    )
-                                )
-                except (AttributeError, TypeError, KeyError) as e:
-                    # Silently skip dataflow path extraction if there's an error
-                    pass
+                # Apply severity and rule filters if configured
+                if severity_filter is not None and finding.severity not in severity_filter:
+                    continue
+                if rule_selected is not None and not rule_selected(finding.rule_id):
+                    continue
+
+                kept_count += 1
+                yield finding
 
-                finding = Finding(
+        logger.info("Converted %s match(es) to findings, skipped %s", kept_count, skipped_count)
+
+    def _convert_dict_matches(self, matches: Iterable[dict]) -> Iterator[Optional[Finding]]:
+        """
+        Convert Semgrep CLI JSON matches to findings.
+
+        The CLI's schema guarantees path/start/end/check_id/extra, so fields
+        are read directly; a malformed match is skipped as a whole.
+
+        Yields:
+            A Finding per match, or None for a match that can't be processed
+        """
+        # Bind lookups used per match to locals
+        severity_get = self.SEVERITY_MAP.get
+        category_of = self._category
+        medium = Severity.MEDIUM
+        new_finding = Finding
+        new_location = Location
+        intern = sys.intern
+        required = operator.itemgetter("check_id", "path", "extra")
+
+        # Severity, category, CWE, remediation and metadata depend only on the
+        # rule, so they are built once per rule; findings of a rule share
+        # one (read-only) metadata dict
+        rule_info = {}
+
+        for match in matches:
+            try:
+                check_id, file_path, extra = required(match)
+                start = match["start"]
+                start_line = start["line"]
+                start_column = start["col"]
+                end = match["end"]
+                end_line = end["line"]
+                end_column = end["col"]
+                snippet = extra.get("lines")
+                if snippet == _REDACTED_LINES:
+                    snippet = None
+                severity_str = extra.get("severity", "WARNING")
+                info = rule_info.get((check_id, severity_str))
+                if info is None:
+                    rule_id = intern(check_id)
+                    rule_severity = intern(severity_str)
+                    metadata = extra.get("metadata") or {}
+                    info = rule_info[(rule_id, rule_severity)] = (
+                        rule_id,
+                        severity_get(rule_severity, medium),
+                        category_of(rule_id),
+                        metadata.get("cwe"),
+                        metadata.get("remediation"),
+                        {
+                            "semgrep_rule_id": rule_id,
+                            "semgrep_severity": rule_severity,
+                            # Include confidence, description, impact, likelihood
+                            "confidence": metadata.get("confidence", "high"),
+                            "description": metadata.get("description"),
+                            "impact": metadata.get("impact"),
+                            "likelihood": metadata.get("likelihood"),
+                        },
+                    )
+                rule_id, severity, category, cwe, remediation, finding_metadata = info
+                yield new_finding(
                     rule_id=rule_id,
-                    message=message,
+                    message=extra.get("message", rule_id),
                     severity=severity,
                     category=category,
-                    location=location,
+                    location=new_location(
+                        file_path=file_path,
+                        start_line=start_line,
+                        start_column=start_column,
+                        end_line=end_line,
+                        end_column=end_column,
+                        snippet=snippet,
+                    ),
                     cwe=cwe,
                     remediation=remediation,
-                    dataflow_path=dataflow_path,
-                    metadata={
-                        "semgrep_rule_id": rule_id,
-                        "semgrep_severity": rule_severity,
-                        **rule_metadata,  # Include confidence, description, impact, likelihood
-                    },
+                    metadata=finding_metadata,
                 )
-
-                # Apply severity filter if configured
-                if self.config.severity_filter:
-                    if finding.severity not in self.config.severity_filter:
-                        continue
-
-                findings.append(finding)
-                converted_count += 1
             except (AttributeError, TypeError, KeyError) as e:
                 # Skip matches that can't be processed
                 # This can happen if the match structure is unexpected
-                skipped_count += 1
-                logger.debug(f"Skipped match {match_idx} due to error: {e}")
-                continue
+                logger.debug("Skipped match due to error: %s", e)
+                yield None
 
-        logger.info(f"Converted {converted_count} match(es) to findings, skipped {skipped_count}")
-        return findings
+    def _convert_object_matches(self, matches: Iterable[Any]) -> Iterator[Optional[Finding]]:
+        """
+        Convert match objects (rather than Semgrep CLI JSON) to findings.
+
+        Yields:
+            A Finding per match, or None for a match that can't be processed
+        """
+        convert = self._convert_object_match
+        for match in matches:
+            try:
+                yield convert(match)
+            except (AttributeError, TypeError, KeyError) as e:
+                logger.debug("Skipped match due to error: %s", e)
+                yield None
 
-    def _extract_snippet(self, match) -> Optional[str]:
-        """Extract code snippet from match."""
-        # Try different ways to get the snippet
+    def _convert_object_match(self, match) -> Finding:
+        """Convert a match object (rather than Semgrep CLI JSON) to a Finding."""
+        try:
+            file_path = str(match.path) if hasattr(match, "path") and match.path else "unknown"
+            start_line = match.start.line if hasattr(match, "start") and match.start else 1
+            start_column = match.start.col if hasattr(match, "start") and match.start else 1
+            end_line = match.end.line if hasattr(match, "end") and match.end else start_line
+            end_column = match.end.col if hasattr(match, "end") and match.end else start_column
+            rule_id = getattr(match, "rule_id", None) or (getattr(match, "check_id", "unknown"))
+            message = getattr(match, "message", rule_id)
+            rule_severity = "WARNING"
+            if hasattr(match, "extra") and match.extra is not None and isinstance(match.extra, dict):
+                rule_severity = match.extra.get("severity", "WARNING")
+        except (AttributeError, TypeError):
+            # Fallback values if match structure is unexpected
+            file_path = "unknown"
+            start_line = 1
+            start_column = 1
+            end_line = 1
+            end_column = 1
+            rule_id = "unknown"
+            message = "Unknown match"
+            rule_severity = "WARNING"
+
+        # Extract code snippet from match, trying the different ways to get it
+        extra = getattr(match, "extra", None)
         if hasattr(match, "lines"):
-            return match.lines
-        if hasattr(match, "extra") and match.extra is not None and isinstance(match.extra, dict):
-            return match.extra.get("lines")
-        if hasattr(match, "snippet"):
-            return match.snippet
-        return None
+            snippet = match.lines
+        elif isinstance(extra, dict):
+            snippet = extra.get("lines")
+        else:
+            snippet = getattr(match, "snippet", None)
+
+        location = Location(
+            file_path=file_path,
+            start_line=start_line,
+            start_column=start_column,
+            end_line=end_line,
+            end_column=end_column,
+            snippet=snippet,
+        )
+
+        # Extract CWE, remediation, and other metadata if available
+        cwe = None
+        remediation = None
+        rule_metadata = {}
+        rule = getattr(match, "rule", None)
+        if rule and hasattr(rule, "metadata") and rule.metadata is not None and isinstance(rule.metadata, dict):
+            cwe = rule.metadata.get("cwe")
+            remediation = rule.metadata.get("remediation")
+            # Extract all metadata fields for AI analysis
+            rule_metadata = {
+                "confidence": rule.metadata.get("confidence", "high"),
+                "description": rule.metadata.get("description"),
+                "impact": rule.metadata.get("impact"),
+                "likelihood": rule.metadata.get("likelihood"),
+            }
+
+        # Extract dataflow path if available
+        dataflow_path = []
+        try:
+            if hasattr(match, "extra") and match.extra is not None and isinstance(match.extra, dict):
+                trace = match.extra.get("dataflow_trace")
+                if trace is not None and isinstance(trace, dict):
+                    source = trace.get("taint_source")
+                    if source is not None and isinstance(source, dict):
+                        # Safely extract start/end positions
+                        start_dict = source.get("start")
+                        if start_dict is None or not isinstance(start_dict, dict):
+                            start_dict = {}
+                        end_dict = source.get("end")
+                        if end_dict is None or not isinstance(end_dict, dict):
+                            end_dict = {}
+                        
+                        dataflow_path.append(
+                            DataflowStep(
+                                file_path=str(source.get("path") or match.path),
+                                start_line=start_dict.get("line") if start_dict else match.start.line,
+                                start_column=start_dict.get("col") if start_dict else match.start.col,
+                                end_line=end_dict.get("line") if end_dict else match.end.line,
+                                end_column=end_dict.get("col") if end_dict else match.end.col,
+                                message="LLM output source",
+                            )
+                        )
+        except (AttributeError, TypeError, KeyError) as e:
+            # Silently skip dataflow path extraction if there's an error
+            pass
+
+        return Finding(
+            rule_id=rule_id,
+            message=message,
+            severity=self.SEVERITY_MAP.get(rule_severity, Severity.MEDIUM),
+            category=self._category(rule_id),
+            location=location,
+            cwe=cwe,
+            remediation=remediation,
+            dataflow_path=dataflow_path,
+            metadata={
+                "semgrep_rule_id": rule_id,
+                "semgrep_severity": rule_severity,
+                **rule_metadata,  # Include confidence, description, impact, likelihood
+            },
+        )
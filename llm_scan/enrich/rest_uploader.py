@@ -1,15 +1,56 @@
 """REST API uploader for sending scan results to a remote server."""
 
+import gzip
 import json
 import logging
-from typing import Optional
+from collections.abc import Sized
+from typing import Any, Iterable, Iterator, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-from ..models import ScanResult
+from ..models import Finding, ScanResult
 
 logger = logging.getLogger(__name__)
 
+# Request bodies larger than this are gzip-compressed
+_GZIP_THRESHOLD = 1 << 20  # 1 MiB
+
+
+def _encode(obj):
+    """Serialize findings as they are reached, rather than as a prebuilt list of dicts."""
+    if isinstance(obj, Finding):
+        return obj.to_dict()
+    if isinstance(obj, Iterator):
+        # Findings passed as an iterator (e.g. SemgrepEngine.iter_findings())
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _count(findings: Iterable[Finding]) -> Any:
+    """Number of findings for log messages ("all" when they are an iterator)."""
+    return len(findings) if isinstance(findings, Sized) else "all"
+
+
+# orjson is optional; it serializes the payload several times faster
+try:
+    import orjson
+
+    def _dumps(obj) -> bytes:
+        # Like json.dumps, accept non-str dict keys (e.g. in metadata); pass
+        # dataclasses to _encode instead of serializing their fields
+        return orjson.dumps(
+            obj,
+            default=_encode,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATACLASS,
+        )
+
+except ImportError:
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, default=_encode).encode()
+
 
 class RESTUploader:
     """Uploader that sends scan results to a REST API endpoint."""
@@ -19,6 +60,7 @@ class RESTUploader:
         endpoint: str,
         api_key: Optional[str] = None,
         application_id: Optional[str] = None,
+        streaming: bool = False,
     ):
         """
         Initialize REST API uploader.
@@ -27,69 +69,178 @@ class RESTUploader:
             endpoint: API endpoint URL (e.g., "https://api.example.com/v1/scans")
             api_key: API key for authentication
             application_id: Application ID to associate with the scan
+            streaming: Make upload() stream NDJSON (see upload_streaming)
         """
         self.endpoint = endpoint
         self.api_key = api_key
         self.application_id = application_id
+        self.streaming = streaming
+
+        # Reuse connections across uploads, and retry gateway errors with backoff
+        retry = Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=[502, 503, 504],
+            allowed_methods=frozenset({"POST"}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(max_retries=retry, pool_connections=4, pool_maxsize=8)
+        self._session = self._new_session(adapter)
+        # Streamed bodies can't be replayed, so they are sent without retries
+        self._stream_session = self._new_session(
+            HTTPAdapter(pool_connections=1, pool_maxsize=2)
+        )
+
+    @staticmethod
+    def _new_session(adapter: HTTPAdapter) -> requests.Session:
+        """Create a session sending through adapter, with the common headers."""
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update({
+            "Content-Type": "application/json",
+            "User-Agent": "trusys-llm-scan/1.0.5",
+        })
+        return session
+
+    def close(self) -> None:
+        """Close the pooled connections."""
+        self._session.close()
+        self._stream_session.close()
 
     def upload(self, result: ScanResult, api_key: Optional[str] = None) -> bool:
         """
         Upload scan results to REST API endpoint.
 
         Args:
-            result: Scan result to upload
+            result: Scan result to upload (its findings may be any iterable
+                of Finding, such as SemgrepEngine.iter_findings())
             api_key: Optional API key (overrides instance api_key if provided)
 
         Returns:
             True if upload successful, False otherwise
         """
-        # Use provided api_key or fall back to instance api_key
-        effective_api_key = api_key or self.api_key
-
-        if not effective_api_key:
-            logger.warning("No API key provided for upload")
-            return False
+        if self.streaming:
+            return self.upload_streaming(result, api_key)
 
-        if not self.application_id:
-            logger.warning("No application_id provided for upload")
+        headers = self._auth_headers(api_key)
+        if headers is None:
             return False
 
         try:
             # Prepare payload
             payload = {
                 "application_id": self.application_id,
-                "findings": [f.to_dict() for f in result.findings],
+                # Converted one at a time by _encode during serialization
+                "findings": result.findings,
                 "scanned_files": result.scanned_files,
                 "rules_loaded": result.rules_loaded,
                 "scan_duration_seconds": result.scan_duration_seconds,
                 "metadata": result.metadata,
             }
 
-            # Prepare headers
-            headers = {
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {effective_api_key}",
-                "User-Agent": "trusys-llm-scan/1.0.5",
-            }
+            # Serialize once; the same bytes are measured and sent
+            body = _dumps(payload)
 
-            logger.info(f"Uploading {len(result.findings)} findings to {self.endpoint}")
-            logger.debug(f"Payload size: {len(json.dumps(payload))} bytes")
+            logger.info("Uploading %s findings to %s", _count(result.findings), self.endpoint)
+            logger.debug("Payload size: %d bytes", len(body))
+            if len(body) > _GZIP_THRESHOLD:
+                # Findings JSON is repetitive; even the fastest level shrinks it several times
+                body = gzip.compress(body, compresslevel=1)
+                headers["Content-Encoding"] = "gzip"
+                logger.debug("Compressed payload to %d bytes", len(body))
+        except Exception as e:
+            logger.error("Unexpected error during upload: %s", e, exc_info=True)
+            return False
 
-            # Send POST request
-            response = requests.post(
-                self.endpoint,
-                json=payload,
-                headers=headers,
-                timeout=30,  # 30 second timeout
-            )
+        return self._send(lambda: self._session.post(
+            self.endpoint,
+            data=body,
+            headers=headers,
+            timeout=30,  # 30 second timeout
+        ))
+
+    def upload_streaming(self, result: ScanResult, api_key: Optional[str] = None) -> bool:
+        """
+        Upload scan results as newline-delimited JSON with chunked transfer encoding.
+
+        The first line holds the scan details (application_id, scanned_files,
+        rules_loaded, scan_duration_seconds, metadata); each following line
+        is one finding. Findings are serialized as they are sent, so memory
+        use doesn't grow with the number of findings. Passing findings as an
+        iterator (e.g. SemgrepEngine.iter_findings()) keeps it that way end
+        to end.
+
+        Args:
+            result: Scan result to upload
+            api_key: Optional API key (overrides instance api_key if provided)
+
+        Returns:
+            True if upload successful, False otherwise
+        """
+        headers = self._auth_headers(api_key)
+        if headers is None:
+            return False
+        headers["Content-Type"] = "application/x-ndjson"
+
+        logger.info("Streaming %s findings to %s", _count(result.findings), self.endpoint)
+
+        # A generator body makes requests use chunked transfer encoding
+        return self._send(lambda: self._stream_session.post(
+            self.endpoint,
+            data=self._iter_ndjson(result),
+            headers=headers,
+            timeout=30,
+        ))
+
+    def _iter_ndjson(self, result: ScanResult) -> Iterator[bytes]:
+        """Yield the NDJSON lines of an upload_streaming body."""
+        yield _dumps({
+            "application_id": self.application_id,
+            "scanned_files": result.scanned_files,
+            "rules_loaded": result.rules_loaded,
+            "scan_duration_seconds": result.scan_duration_seconds,
+            "metadata": result.metadata,
+        }) + b"\n"
+        for finding in result.findings:
+            yield _dumps(finding) + b"\n"
+
+    def _auth_headers(self, api_key: Optional[str]) -> Optional[dict]:
+        """Return the per-request headers, or None if the upload can't be authenticated."""
+        # Use provided api_key or fall back to instance api_key
+        effective_api_key = api_key or self.api_key
+
+        if not effective_api_key:
+            logger.warning("No API key provided for upload")
+            return None
+
+        if not self.application_id:
+            logger.warning("No application_id provided for upload")
+            return None
+
+        # Content-Type and User-Agent are set on the session
+        return {"Authorization": f"Bearer {effective_api_key}"}
+
+    def _send(self, send) -> bool:
+        """
+        Send an upload request and report its outcome.
+
+        Args:
+            send: Callable performing the request and returning the response
+
+        Returns:
+            True if upload successful, False otherwise
+        """
+        try:
+            response = send()
 
             # Check response
             if response.status_code == 200 or response.status_code == 201:
-                logger.info(f"✓ Successfully uploaded results (status: {response.status_code})")
+                logger.info("✓ Successfully uploaded results (status: %s)", response.status_code)
                 return True
             else:
                 logger.error(
-                    f"Upload failed with status {response.status_code}: {response.text}"
+                    "Upload failed with status %s: %s", response.status_code, response.text
                 )
                 return False
 
@@ -97,11 +248,11 @@ class RESTUploader:
             logger.error("Upload request timed out")
             return False
         except requests.exceptions.ConnectionError as e:
-            logger.error(f"Connection error during upload: {e}")
+            logger.error("Connection error during upload: %s", e)
             return False
         except requests.exceptions.RequestException as e:
-            logger.error(f"Request error during upload: {e}")
+            logger.error("Request error during upload: %s", e)
             return False
         except Exception as e:
-            logger.error(f"Unexpected error during upload: {e}", exc_info=True)
+            logger.error("Unexpected error during upload: %s", e, exc_info=True)
             return False
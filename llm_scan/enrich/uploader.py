@@ -23,6 +23,9 @@ class Uploader(ABC):
         """
         pass
 
+    def close(self) -> None:
+        """Release resources held by the uploader (e.g. pooled connections)."""
+
 
 class StubUploader(Uploader):
     """Stub implementation that does not actually upload."""
@@ -1,5 +1,6 @@
 """Data models for findings and scan results."""
 
+import sys
 from dataclasses import dataclass, field
 from enum import Enum
 from typing import Any, Dict, List, Optional
@@ -26,7 +27,13 @@ class Category(str, Enum):
     OTHER = "other"
 
 
-@dataclass
+# Enum .value goes through a descriptor on every access; indexing these is
+# several times faster on per-finding serialization paths
+_SEVERITY_VALUE = {severity: severity.value for severity in Severity}
+_CATEGORY_VALUE = {category: category.value for category in Category}
+
+
+@dataclass(slots=True)
 class Location:
     """Source code location."""
 
@@ -38,7 +45,7 @@ class Location:
     snippet: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class DataflowStep:
     """A step in a dataflow path."""
 
@@ -50,7 +57,7 @@ class DataflowStep:
     message: str
 
 
-@dataclass
+@dataclass(slots=True)
 class AIVerdict:
     """AI analysis verdict for a finding."""
 
@@ -62,7 +69,7 @@ class AIVerdict:
     additional_context: Dict[str, Any] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class Finding:
     """A security finding."""
 
@@ -79,13 +86,22 @@ class Finding:
     ai_filtered: bool = False
     source: str = "semgrep"  # Track source: "semgrep" or "ai-enhanced"
 
+    def __post_init__(self) -> None:
+        # Scans repeat a few hundred rule IDs and file paths across many
+        # findings; interning shares one string each and lets dict lookups
+        # keyed by them match on identity
+        if type(self.rule_id) is str:
+            self.rule_id = sys.intern(self.rule_id)
+        if type(self.location.file_path) is str:
+            self.location.file_path = sys.intern(self.location.file_path)
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert finding to dictionary."""
         result = {
             "rule_id": self.rule_id,
             "message": self.message,
-            "severity": self.severity.value,
-            "category": self.category.value,
+            "severity": _SEVERITY_VALUE[self.severity],
+            "category": _CATEGORY_VALUE[self.category],
             "location": {
                 "file_path": self.location.file_path,
                 "start_line": self.location.start_line,
@@ -120,7 +136,7 @@ class Finding:
                 "confidence": self.ai_analysis.confidence,
                 "reasoning": self.ai_analysis.reasoning,
                 "suggested_severity": (
-                    self.ai_analysis.suggested_severity.value
+                    _SEVERITY_VALUE[self.ai_analysis.suggested_severity]
                     if self.ai_analysis.suggested_severity
                     else None
                 ),
@@ -138,7 +154,7 @@ class Finding:
         return result
 
 
-@dataclass
+@dataclass(slots=True)
 class ScanResult:
     """Complete scan result."""
 
@@ -147,6 +163,10 @@ class ScanResult:
     rules_loaded: List[str]
     scan_duration_seconds: float
     metadata: Dict[str, Any] = field(default_factory=dict)
+    # First finding per rule_id, in findings order; filled while the result is
+    # assembled so SARIF output needn't walk all findings for its rule list.
+    # Empty means not built.
+    rule_index: Dict[str, Finding] = field(default_factory=dict)
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert scan result to dictionary."""
@@ -159,7 +179,7 @@ class ScanResult:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class ScanRequest:
     """Request for a scan (used by VS Code extension)."""
 
@@ -172,7 +192,7 @@ class ScanRequest:
     output_format: str = "json"
 
 
-@dataclass
+@dataclass(slots=True)
 class ScanResponse:
     """Response from a scan (used by VS Code extension)."""
 
@@ -1,6 +1,9 @@
 """Console output formatter for human-readable output."""
 
-from collections import defaultdict
+import io
+import sys
+from itertools import groupby
+from operator import attrgetter
 from typing import Dict, List
 
 from ..models import Finding, ScanResult
@@ -30,41 +33,31 @@ class ConsoleFormatter:
         Returns:
             Formatted string
         """
+        bold = self.BOLD if use_color else ""
+        reset = self.RESET if use_color else ""
         if not result.findings:
-            return f"\n{self.BOLD if use_color else ''}✓ No issues found{self.RESET if use_color else ''}\n"
+            return f"\n{bold}✓ No issues found{reset}\n"
+        # Color prefix per severity value, resolved once rather than per finding
+        severity_colors = self.SEVERITY_COLORS if use_color else {}
 
-        # Group findings by file
-        findings_by_file = defaultdict(list)
-        for finding in result.findings:
-            findings_by_file[finding.location.file_path].append(finding)
-
-        output = []
-        output.append(
-            f"\n{self.BOLD if use_color else ''}Scan Results{self.RESET if use_color else ''}\n"
-        )
-        output.append("=" * 80)
-        output.append(
-            f"Found {len(result.findings)} issue(s) in {len(findings_by_file)} file(s)\n"
+        # One sort by (file, line) orders both the files and each file's findings
+        sorted_findings = sorted(
+            result.findings, key=attrgetter("location.file_path", "location.start_line")
         )
 
-        # Sort files alphabetically
-        for file_path in sorted(findings_by_file.keys()):
-            findings = findings_by_file[file_path]
-            output.append(f"\n{self.BOLD if use_color else ''}{file_path}{self.RESET if use_color else ''}")
-            output.append("-" * 80)
-
-            # Sort findings by line number
-            findings.sort(key=lambda f: f.location.start_line)
+        buf = io.StringIO()
+        w = buf.write
+        file_count = 0
+        for file_path, findings in groupby(sorted_findings, key=attrgetter("location.file_path")):
+            file_count += 1
+            w(f"\n{bold}{file_path}{reset}\n")
+            w("-" * 80 + "\n")
 
             for finding in findings:
-                severity_color = (
-                    self.SEVERITY_COLORS.get(finding.severity.value, "")
-                    if use_color
-                    else ""
-                )
-                
+                severity = finding.severity.value
+                severity_color = severity_colors.get(severity, "")
+
                 # Show source indicator
-                source_indicator = ""
                 if finding.ai_analysis:
                     if finding.ai_filtered:
                         source_indicator = " [AI: FILTERED]"
@@ -74,44 +67,92 @@ class ConsoleFormatter:
                         source_indicator = " [AI: ANALYZED]"
                 else:
                     source_indicator = " [Semgrep]"
-                
-                output.append(
-                    f"  {severity_color}[{finding.severity.value.upper()}]{self.RESET if use_color else ''} "
-                    f"{finding.rule_id}{source_indicator}"
-                )
-                output.append(
-                    f"    Line {finding.location.start_line}:{finding.location.start_column} - {finding.message}"
+
+                location = finding.location
+                w(
+                    f"  {severity_color}[{severity.upper()}]{reset} "
+                    f"{finding.rule_id}{source_indicator}\n"
                 )
-                
+                w(f"    Line {location.start_line}:{location.start_column} - {finding.message}\n")
+
                 # Show AI analysis if present
                 if finding.ai_analysis and not finding.ai_filtered:
                     ai_confidence = finding.ai_analysis.confidence
                     confidence_emoji = "✓" if ai_confidence >= 0.7 else "⚠" if ai_confidence >= 0.5 else "?"
-                    output.append(
+                    reasoning = finding.ai_analysis.reasoning
+                    w(
                         f"    AI Analysis: {confidence_emoji} Confidence: {ai_confidence:.2f} - "
-                        f"{finding.ai_analysis.reasoning[:100]}{'...' if len(finding.ai_analysis.reasoning) > 100 else ''}"
+                        f"{reasoning[:100]}{'...' if len(reasoning) > 100 else ''}\n"
                     )
-                
-                if finding.location.snippet:
+
+                if location.snippet:
                     # Show snippet with context
-                    snippet_lines = finding.location.snippet.strip().split("\n")
+                    snippet_lines = location.snippet.strip().split("\n")
                     for snippet_line in snippet_lines[:3]:  # Limit to 3 lines
-                        output.append(f"    {snippet_line}")
-                
+                        w(f"    {snippet_line}\n")
+
                 if finding.remediation:
                     remediation_label = "Remediation"
                     if finding.source == "ai-enhanced":
                         remediation_label = "Remediation (AI-Enhanced)"
-                    output.append(f"    {remediation_label}: {finding.remediation}")
-                output.append("")
-
-        output.append("=" * 80)
-        output.append(
-            f"\nScanned {len(result.scanned_files)} file(s) in {result.scan_duration_seconds:.2f}s"
+                    w(f"    {remediation_label}: {finding.remediation}\n")
+                w("\n")
+
+        w("=" * 80 + "\n")
+        w(f"\nScanned {len(result.scanned_files)} file(s) in {result.scan_duration_seconds:.2f}s\n")
+        w(f"Loaded {len(result.rules_loaded)} rule(s)\n")
+
+        # The header needs the file count, so it is prepended once all files are written
+        header = (
+            f"\n{bold}Scan Results{reset}\n\n"
+            + "=" * 80
+            + f"\nFound {len(result.findings)} issue(s) in {file_count} file(s)\n\n"
         )
-        output.append(f"Loaded {len(result.rules_loaded)} rule(s)\n")
+        return header + buf.getvalue()
+
+    def format_bytes(
+        self,
+        result: ScanResult,
+        use_color: bool = True,
+        encoding: str = "utf-8",
+        errors: str = "strict",
+    ) -> bytes:
+        """
+        Format scan result for console output as encoded bytes.
 
-        return "\n".join(output)
+        Args:
+            result: Scan result to format
+            use_color: Whether to use ANSI color codes
+            encoding: Output encoding
+            errors: Encoding error handler
+
+        Returns:
+            Formatted output, encoded in one pass
+        """
+        return self.format(result, use_color).encode(encoding, errors)
+
+    def write_to_stdout(self, result: ScanResult, use_color: bool = True) -> None:
+        """
+        Print console output, followed by a newline, to stdout.
+
+        The report is encoded once and written to the binary buffer in a single
+        call rather than going through the text layer.
+        """
+        stdout = sys.stdout
+        buffer = getattr(stdout, "buffer", None)
+        if buffer is None:
+            # Replaced stdout (e.g. captured output) without a binary layer
+            print(self.format(result, use_color))
+            return
+        # Flush the text layer first so earlier prints stay in order
+        stdout.flush()
+        buffer.write(
+            self.format_bytes(
+                result, use_color, stdout.encoding or "utf-8", stdout.errors or "strict"
+            )
+            + b"\n"
+        )
+        buffer.flush()
 
     def write(self, result: ScanResult, output_path: str) -> None:
         """Write console output to file."""
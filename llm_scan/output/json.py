@@ -1,9 +1,38 @@
 """JSON output formatter."""
 
 import json
-from typing import Dict
+from typing import Any, Dict
 
-from ..models import ScanResult
+from ..models import Finding, ScanResult
+
+# orjson is optional; it writes large reports several times faster
+try:
+    import orjson
+
+    def _dumps(obj, default=None) -> bytes:
+        # Like json.dump, accept non-str dict keys (e.g. in metadata); pass
+        # dataclasses to default instead of serializing their fields
+        return orjson.dumps(
+            obj,
+            default=default,
+            option=(
+                orjson.OPT_INDENT_2
+                | orjson.OPT_NON_STR_KEYS
+                | orjson.OPT_PASSTHROUGH_DATACLASS
+            ),
+        )
+
+except ImportError:
+
+    def _dumps(obj, default=None) -> bytes:
+        return json.dumps(obj, indent=2, default=default).encode()
+
+
+def _encode_finding(obj):
+    """Serialize findings as the encoder reaches them, one dict at a time."""
+    if isinstance(obj, Finding):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
 
 
 class JSONFormatter:
@@ -16,6 +45,10 @@ class JSONFormatter:
         Returns:
             JSON-serializable dictionary
         """
+        return self._document(result, [f.to_dict() for f in result.findings])
+
+    def _document(self, result: ScanResult, findings: Any) -> Dict:
+        """Build the JSON document around findings (dicts, or Finding objects to encode lazily)."""
         return {
             "version": "1.0",
             "tool": {
@@ -24,7 +57,7 @@ class JSONFormatter:
             },
             "runs": [
                 {
-                    "findings": result.to_dict()["findings"],
+                    "findings": findings,
                     "scanned_files": result.scanned_files,
                     "rules_loaded": result.rules_loaded,
                     "scan_duration_seconds": result.scan_duration_seconds,
@@ -35,6 +68,7 @@ class JSONFormatter:
 
     def write(self, result: ScanResult, output_path: str) -> None:
         """Write JSON output to file."""
-        json_data = self.format(result)
-        with open(output_path, "w") as f:
-            json.dump(json_data, f, indent=2)
+        # Findings are converted as they are written, not as a prebuilt list
+        json_data = self._document(result, result.findings)
+        with open(output_path, "wb") as f:
+            f.write(_dumps(json_data, default=_encode_finding))
@@ -1,18 +1,63 @@
 """SARIF output formatter for GitHub Code Scanning."""
 
+import itertools
 import json
+import logging
 import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional
 
-from ..models import Finding, ScanResult
+from ..models import Finding, ScanResult, Severity
 
+logger = logging.getLogger(__name__)
 
-def _to_relative_uri(file_path: str, root_path: Optional[str] = None) -> str:
-    """Convert absolute path to URI relative to root (forward slashes)."""
+# orjson is optional; it writes large reports several times faster
+try:
+    import orjson
+
+    def _dumps(obj, default=None, indent: bool = True) -> bytes:
+        # Like json.dump, accept non-str dict keys (e.g. in metadata); pass
+        # dataclasses to default instead of serializing their fields
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATACLASS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=default, option=option)
+
+except ImportError:
+
+    def _dumps(obj, default=None, indent: bool = True) -> bytes:
+        if indent:
+            return json.dumps(obj, indent=2, default=default).encode()
+        return json.dumps(obj, separators=(",", ":"), default=default).encode()
+
+# Placeholder for the results array when streaming; serialized as a JSON
+# string, so the document can be split around it
+_RESULTS_MARKER = "\x00results\x00"
+
+# Write buffer for streamed reports
+_STREAM_BUFFER_SIZE = 256 * 1024
+
+# Streamed reports with more findings than this are formatted in worker processes
+_PARALLEL_THRESHOLD = 10000
+_PARALLEL_CHUNKSIZE = 256
+
+
+# SARIF level per severity, built once rather than per finding
+_SARIF_LEVELS = {
+    Severity.CRITICAL: "error",
+    Severity.HIGH: "error",
+    Severity.MEDIUM: "warning",
+    Severity.LOW: "note",
+    Severity.INFO: "note",
+}
+
+
+def _to_relative_uri(file_path: str, root: Path) -> str:
+    """Convert absolute path to URI relative to a resolved root (forward slashes)."""
     if not file_path or file_path == "unknown":
         return file_path
-    root = Path(root_path or os.getcwd()).resolve()
     path_obj = Path(file_path).resolve()
     try:
         rel = path_obj.relative_to(root)
@@ -22,12 +67,85 @@ def _to_relative_uri(file_path: str, root_path: Optional[str] = None) -> str:
     return rel.as_posix()
 
 
+def _uri_mapper(root_path: Optional[str] = None) -> Callable[[str], str]:
+    """
+    Return a memoized path-to-URI function for one report.
+
+    The root is resolved once, and each distinct file path once, instead of
+    per finding and dataflow step (resolve() stats every path component).
+    A normalized path under the root whose directory is already canonical
+    (checked once per directory) and which isn't itself a symlink resolves
+    to itself, so it is made relative with string operations instead.
+    """
+    root = Path(root_path or os.getcwd()).resolve()
+    prefix = str(root).rstrip(os.sep) + os.sep
+    prefix_len = len(prefix)
+    cache: Dict[str, str] = {}
+    canonical_dirs: Dict[str, bool] = {}
+
+    def is_canonical_dir(directory: str) -> bool:
+        canonical = canonical_dirs.get(directory)
+        if canonical is None:
+            canonical = canonical_dirs[directory] = os.path.realpath(directory) == directory
+        return canonical
+
+    def uri_of(file_path: str) -> str:
+        uri = cache.get(file_path)
+        if uri is None:
+            if (
+                file_path
+                and file_path.startswith(prefix)
+                and os.path.normpath(file_path) == file_path
+                and is_canonical_dir(os.path.dirname(file_path))
+                and not os.path.islink(file_path)
+            ):
+                uri = file_path[prefix_len:].replace(os.sep, "/")
+            else:
+                uri = _to_relative_uri(file_path, root)
+            cache[file_path] = uri
+        return uri
+
+    return uri_of
+
+
+# Per-process state of formatter workers, set by _init_worker
+_worker_formatter: Optional["SARIFFormatter"] = None
+_worker_uri_of: Optional[Callable[[str], str]] = None
+
+
+def _init_worker(uris: Dict[str, str]) -> None:
+    """Set up a formatter worker with URIs resolved by the parent process."""
+    global _worker_formatter, _worker_uri_of
+    _worker_formatter = SARIFFormatter()
+    _worker_uri_of = uris.__getitem__
+
+
+def _format_one_finding(finding: Finding) -> bytes:
+    """
+    Format and serialize one finding in a worker process.
+
+    Top-level so it can be pickled. Returns compact JSON bytes, which are far
+    cheaper to send back to the parent than the result dict.
+    """
+    return _dumps(_worker_formatter._format_result(finding, _worker_uri_of), indent=False)
+
+
 class SARIFFormatter:
     """Formatter for SARIF (Static Analysis Results Interchange Format) output."""
 
     TOOL_NAME = "trusys-llm-scan"
     TOOL_VERSION = "1.0.5"
 
+    def __init__(self, workers: int = 1):
+        """
+        Initialize SARIF formatter.
+
+        Args:
+            workers: Processes used to format results of large streamed reports
+                (see write_streaming; 1 = in-process)
+        """
+        self.workers = workers
+
     def format(self, result: ScanResult, root_path: Optional[str] = None) -> Dict:
         """
         Format scan result as SARIF.
@@ -39,6 +157,10 @@ class SARIFFormatter:
         Returns:
             SARIF JSON structure
         """
+        return self._document(result, self._format_results(result.findings, root_path))
+
+    def _document(self, result: ScanResult, results: Any) -> Dict:
+        """Build the SARIF document around results (dicts, or Finding objects to encode lazily)."""
         # SARIF version 2.1.0
         sarif = {
             "version": "2.1.0",
@@ -50,10 +172,10 @@ class SARIFFormatter:
                             "name": self.TOOL_NAME,
                             "version": self.TOOL_VERSION,
                             "informationUri": "https://github.com/spydra-tech/truscan",
-                            "rules": self._extract_rules(result.findings),
+                            "rules": self._extract_rules(result),
                         }
                     },
-                    "results": self._format_results(result.findings, root_path),
+                    "results": results,
                     "invocations": [
                         {
                             "executionSuccessful": True,
@@ -66,118 +188,200 @@ class SARIFFormatter:
 
         return sarif
 
-    def _extract_rules(self, findings: List[Finding]) -> List[Dict]:
+    def _extract_rules(self, result: ScanResult) -> List[Dict]:
         """Extract unique rules from findings."""
-        rules = {}
-        for finding in findings:
-            if finding.rule_id not in rules:
-                rules[finding.rule_id] = {
-                    "id": finding.rule_id,
-                    "name": finding.rule_id,
-                    "shortDescription": {
-                        "text": finding.message,
-                    },
-                    "fullDescription": {
-                        "text": finding.message,
-                    },
-                    "defaultConfiguration": {
-                        "level": self._severity_to_sarif_level(finding.severity),
-                    },
-                    "properties": {
-                        "category": finding.category.value,
-                    },
-                }
-                if finding.cwe:
-                    rules[finding.rule_id]["properties"]["cwe"] = finding.cwe
-                if finding.remediation:
-                    rules[finding.rule_id]["help"] = {
-                        "text": finding.remediation,
-                    }
+        if result.rule_index:
+            rule_findings = result.rule_index.values()
+        else:
+            # Result built without an index; take the first finding per rule
+            first_by_rule = {}
+            for finding in result.findings:
+                if finding.rule_id not in first_by_rule:
+                    first_by_rule[finding.rule_id] = finding
+            rule_findings = first_by_rule.values()
+        return [self._rule_descriptor(finding) for finding in rule_findings]
 
-        return list(rules.values())
+    def _rule_descriptor(self, finding: Finding) -> Dict:
+        """Build the SARIF rule descriptor from a rule's first finding."""
+        rule = {
+            "id": finding.rule_id,
+            "name": finding.rule_id,
+            "shortDescription": {
+                "text": finding.message,
+            },
+            "fullDescription": {
+                "text": finding.message,
+            },
+            "defaultConfiguration": {
+                "level": self._severity_to_sarif_level(finding.severity),
+            },
+            "properties": {
+                "category": finding.category.value,
+            },
+        }
+        if finding.cwe:
+            rule["properties"]["cwe"] = finding.cwe
+        if finding.remediation:
+            rule["help"] = {
+                "text": finding.remediation,
+            }
+        return rule
 
     def _format_results(self, findings: List[Finding], root_path: Optional[str] = None) -> List[Dict]:
         """Format findings as SARIF results. Artifact URIs are relative to root_path."""
-        results = []
-        for finding in findings:
-            uri = _to_relative_uri(finding.location.file_path, root_path)
-            result = {
-                "ruleId": finding.rule_id,
-                "level": self._severity_to_sarif_level(finding.severity),
-                "message": {
-                    "text": finding.message,
-                },
-                "locations": [
-                    {
-                        "physicalLocation": {
-                            "artifactLocation": {
-                                "uri": uri,
-                            },
-                            "region": {
-                                "startLine": finding.location.start_line,
-                                "startColumn": finding.location.start_column,
-                                "endLine": finding.location.end_line,
-                                "endColumn": finding.location.end_column,
-                            },
-                        }
-                    }
-                ],
-            }
+        uri_of = _uri_mapper(root_path)
+        return [self._format_result(finding, uri_of) for finding in findings]
 
-            # Add code snippet if available
-            if finding.location.snippet:
-                result["locations"][0]["physicalLocation"]["region"]["snippet"] = {
-                    "text": finding.location.snippet,
+    def _format_result(self, finding: Finding, uri_of: Callable[[str], str]) -> Dict:
+        """Format one finding as a SARIF result, mapping paths to URIs with uri_of."""
+        uri = uri_of(finding.location.file_path)
+        result = {
+            "ruleId": finding.rule_id,
+            "level": self._severity_to_sarif_level(finding.severity),
+            "message": {
+                "text": finding.message,
+            },
+            "locations": [
+                {
+                    "physicalLocation": {
+                        "artifactLocation": {
+                            "uri": uri,
+                        },
+                        "region": {
+                            "startLine": finding.location.start_line,
+                            "startColumn": finding.location.start_column,
+                            "endLine": finding.location.end_line,
+                            "endColumn": finding.location.end_column,
+                        },
+                    }
                 }
+            ],
+        }
 
-            # Add dataflow path if available
-            if finding.dataflow_path:
-                code_flows = []
-                thread_flows = []
-                for step in finding.dataflow_path:
-                    step_uri = _to_relative_uri(step.file_path, root_path)
-                    thread_flows.append(
-                        {
-                            "locations": [
-                                {
-                                    "location": {
-                                        "physicalLocation": {
-                                            "artifactLocation": {
-                                                "uri": step_uri,
-                                            },
-                                            "region": {
-                                                "startLine": step.start_line,
-                                                "startColumn": step.start_column,
-                                                "endLine": step.end_line,
-                                                "endColumn": step.end_column,
-                                            },
+        # Add code snippet if available
+        if finding.location.snippet:
+            result["locations"][0]["physicalLocation"]["region"]["snippet"] = {
+                "text": finding.location.snippet,
+            }
+
+        # Add dataflow path if available
+        if finding.dataflow_path:
+            code_flows = []
+            thread_flows = []
+            for step in finding.dataflow_path:
+                step_uri = uri_of(step.file_path)
+                thread_flows.append(
+                    {
+                        "locations": [
+                            {
+                                "location": {
+                                    "physicalLocation": {
+                                        "artifactLocation": {
+                                            "uri": step_uri,
+                                        },
+                                        "region": {
+                                            "startLine": step.start_line,
+                                            "startColumn": step.start_column,
+                                            "endLine": step.end_line,
+                                            "endColumn": step.end_column,
                                         },
-                                        "message": {"text": step.message},
-                                    }
+                                    },
+                                    "message": {"text": step.message},
                                 }
-                            ]
-                        }
-                    )
-                code_flows.append({"threadFlows": thread_flows})
-                result["codeFlows"] = code_flows
-
-            results.append(result)
+                            }
+                        ]
+                    }
+                )
+            code_flows.append({"threadFlows": thread_flows})
+            result["codeFlows"] = code_flows
 
-        return results
+        return result
 
     def _severity_to_sarif_level(self, severity) -> str:
         """Convert severity to SARIF level."""
-        mapping = {
-            "critical": "error",
-            "high": "error",
-            "medium": "warning",
-            "low": "note",
-            "info": "note",
-        }
-        return mapping.get(severity.value, "warning")
+        return _SARIF_LEVELS.get(severity, "warning")
 
     def write(self, result: ScanResult, output_path: str, root_path: Optional[str] = None) -> None:
         """Write SARIF output to file. Artifact URIs are relative to root_path (default: cwd)."""
-        sarif_data = self.format(result, root_path=root_path)
-        with open(output_path, "w") as f:
-            json.dump(sarif_data, f, indent=2)
+        # Findings are converted as they are written, not as a prebuilt list
+        uri_of = _uri_mapper(root_path)
+
+        def encode_finding(obj):
+            if isinstance(obj, Finding):
+                return self._format_result(obj, uri_of)
+            raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+        sarif_data = self._document(result, result.findings)
+        with open(output_path, "wb") as f:
+            f.write(_dumps(sarif_data, default=encode_finding))
+
+    def write_streaming(
+        self, result: ScanResult, output_path: str, root_path: Optional[str] = None
+    ) -> None:
+        """
+        Write SARIF output to file one result at a time.
+
+        Unlike write(), the full document is never held in memory: the header
+        (tool and rules), each result and the footer are serialized and
+        written separately, so peak memory is one result rather than the
+        whole report. The output is compact (not indented) JSON.
+
+        Args:
+            result: Scan result with findings.
+            output_path: Path of the SARIF file to write.
+            root_path: Base path for relative artifact URIs (default: cwd).
+        """
+        uri_of = _uri_mapper(root_path)
+        document = _dumps(self._document(result, _RESULTS_MARKER), indent=False)
+        # The marker comes after any rule text, so split at its last occurrence
+        header, footer = document.rsplit(_dumps(_RESULTS_MARKER, indent=False), 1)
+
+        with open(output_path, "wb", buffering=_STREAM_BUFFER_SIZE) as f:
+            f.write(header)
+            f.write(b"[")
+            for i, serialized in enumerate(self._iter_serialized_results(result.findings, uri_of)):
+                if i:
+                    f.write(b",")
+                f.write(serialized)
+            f.write(b"]")
+            f.write(footer)
+
+    def _iter_serialized_results(
+        self, findings: List[Finding], uri_of: Callable[[str], str]
+    ) -> Iterator[bytes]:
+        """Yield each finding as compact SARIF result JSON, in order."""
+        done = 0
+        if self.workers > 1 and len(findings) > _PARALLEL_THRESHOLD:
+            try:
+                for serialized in self._iter_serialized_parallel(findings, uri_of):
+                    yield serialized
+                    done += 1
+                return
+            except (OSError, BrokenProcessPool) as e:
+                # The pool may fail to start or lose a worker partway through;
+                # continue in-process after the results already yielded
+                logger.debug(
+                    "Parallel SARIF formatting failed after %d result(s), "
+                    "formatting the rest in-process: %s",
+                    done,
+                    e,
+                )
+        for finding in itertools.islice(findings, done, None):
+            yield _dumps(self._format_result(finding, uri_of), indent=False)
+
+    def _iter_serialized_parallel(
+        self, findings: List[Finding], uri_of: Callable[[str], str]
+    ) -> Iterator[bytes]:
+        """Format and serialize findings across worker processes, preserving order."""
+        # Resolve URIs here so workers don't stat the same paths again; the
+        # path -> URI dict is pickled once per worker
+        uris = {}
+        for finding in findings:
+            uris[finding.location.file_path] = uri_of(finding.location.file_path)
+            for step in finding.dataflow_path:
+                uris[step.file_path] = uri_of(step.file_path)
+
+        with ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_init_worker, initargs=(uris,)
+        ) as pool:
+            yield from pool.map(_format_one_finding, findings, chunksize=_PARALLEL_CHUNKSIZE)
@@ -11,7 +11,6 @@ from typing import List, Optional
 from .config import ScanConfig
 from .enrich.uploader import StubUploader, Uploader
 from .enrich.rest_uploader import RESTUploader
-from .engine.ai_engine import AIEngine
 from .engine.semgrep_engine import SemgrepEngine
 from .models import ScanRequest, ScanResponse, ScanResult
 from .output.console import ConsoleFormatter
@@ -158,7 +157,8 @@ def run_scan(config: ScanConfig, uploader: Optional[Uploader] = None) -> ScanRes
     logger.info("")
     logger.info("Step 3: Running Semgrep scan...")
     logger.debug(f"Scanning {len(scanned_files)} file(s) with Semgrep")
-    findings = engine.scan()
+    with engine:
+        findings = engine.scan()
     logger.info(f"✓ Scan completed, found {len(findings)} finding(s)")
 
     # AI filtering (if enabled)
@@ -168,8 +168,11 @@ def run_scan(config: ScanConfig, uploader: Optional[Uploader] = None) -> ScanRes
         logger.info("Step 3.5: Running AI Analysis...")
         logger.info("=" * 80)
         try:
-            ai_engine = AIEngine(config)
-            if not ai_engine.provider:
+            # Imported lazily so scans without AI filtering skip the AI modules
+            from .engine.ai_engine import AIEngine
+
+            ai_engine = AIEngine.maybe_create(config)
+            if not ai_engine or not ai_engine.provider:
                 logger.error("")
                 logger.error("=" * 80)
                 logger.error("❌ AI PROVIDER INITIALIZATION FAILED")
@@ -187,7 +190,8 @@ def run_scan(config: ScanConfig, uploader: Optional[Uploader] = None) -> ScanRes
                 logger.info(f"  Found {len(findings)} finding(s) from Semgrep")
                 file_contents = load_file_contents(findings)
                 findings_before_ai = len(findings)
-                findings = ai_engine.filter_false_positives(findings, file_contents)
+                with ai_engine:
+                    findings = ai_engine.filter_false_positives(findings, file_contents)
                 findings_after_ai = len(findings)
                 filtered_count = findings_before_ai - findings_after_ai
                 logger.info("")
@@ -230,8 +234,12 @@ def run_scan(config: ScanConfig, uploader: Optional[Uploader] = None) -> ScanRes
     ai_analyzed_count = 0
     ai_enhanced_count = 0
     semgrep_only_count = 0
-    
+    rule_index = {}
+
     for finding in findings:
+        # Index rules in the same pass (filtered findings still appear in output)
+        if finding.rule_id not in rule_index:
+            rule_index[finding.rule_id] = finding
         if finding.ai_filtered:
             ai_filtered_count += 1
             continue
@@ -254,6 +262,7 @@ def run_scan(config: ScanConfig, uploader: Optional[Uploader] = None) -> ScanRes
         scanned_files=scanned_files,
         rules_loaded=rules_loaded,
         scan_duration_seconds=scan_duration,
+        rule_index=rule_index,
     )
     logger.info("✓ Results generated")
 
@@ -419,6 +428,11 @@ def main() -> int:
         default="console",
         help="Output format (default: console)",
     )
+    parser.add_argument(
+        "--stream-output",
+        action="store_true",
+        help="Write SARIF results one at a time as compact JSON (lower memory on large reports)",
+    )
     parser.add_argument(
         "--out",
         help="Output file path (required for sarif/json, optional for console)",
@@ -456,6 +470,40 @@ def main() -> int:
         action="store_true",
         help="Do not respect .gitignore",
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="Number of Semgrep worker processes (default: CPU count, at most 8)",
+    )
+    parser.add_argument(
+        "--sharded-scan",
+        action="store_true",
+        help="Split large scans across up to 4 concurrent Semgrep processes",
+    )
+    parser.add_argument(
+        "--semgrep-max-memory",
+        type=int,
+        default=4096,
+        help="Memory limit for Semgrep in MiB, 0 for none (default: 4096)",
+    )
+    parser.add_argument(
+        "--semgrep-timeout",
+        type=int,
+        default=60,
+        help="Seconds Semgrep may spend on one rule and file, 0 for no limit (default: 60)",
+    )
+    parser.add_argument(
+        "--no-parse-cache",
+        action="store_true",
+        help="Do not reuse Semgrep's cached parse results from previous runs",
+    )
+    parser.add_argument(
+        "--no-finding-cache",
+        action="store_true",
+        help="Rescan every file instead of reusing results for files unchanged since the last scan",
+    )
     parser.add_argument(
         "--upload",
         help="Upload endpoint URL for sending results to server",
@@ -468,6 +516,11 @@ def main() -> int:
         "--application-id",
         help="Application ID to associate with the scan results",
     )
+    parser.add_argument(
+        "--upload-streaming",
+        action="store_true",
+        help="Stream results to the upload endpoint as NDJSON (one finding per line)",
+    )
     # AI filtering options
     parser.add_argument(
         "--enable-ai-filter",
@@ -476,15 +529,19 @@ def main() -> int:
     )
     parser.add_argument(
         "--ai-provider",
-        choices=["openai", "anthropic"],
+        choices=["openai", "anthropic", "local"],
         default="openai",
-        help="AI provider to use (default: openai)",
+        help="AI provider to use (default: openai). 'local' runs a GGUF model given by --ai-model",
     )
     parser.add_argument(
         "--ai-model",
         default="gpt-4",
         help="AI model to use (default: gpt-4)",
     )
+    parser.add_argument(
+        "--ai-local-model",
+        help="GGUF model to try before the cloud provider; only low-confidence results are escalated",
+    )
     parser.add_argument(
         "--ai-api-key",
         help="AI API key (or use OPENAI_API_KEY/ANTHROPIC_API_KEY env var)",
@@ -586,10 +643,17 @@ def main() -> int:
         output_format=args.format,
         output_file=args.out,
         respect_gitignore=not args.no_gitignore,
+        enable_parse_cache=not args.no_parse_cache,
+        enable_finding_cache=not args.no_finding_cache,
+        jobs=args.jobs,
+        sharded_scan=args.sharded_scan,
+        semgrep_max_memory=args.semgrep_max_memory,
+        semgrep_timeout=args.semgrep_timeout,
         enable_ai_filter=args.enable_ai_filter,
         ai_provider=args.ai_provider,
         ai_api_key=ai_api_key,
         ai_model=args.ai_model,
+        ai_local_model=args.ai_local_model,
         ai_confidence_threshold=args.ai_confidence_threshold,
         ai_analyze_rules=args.ai_analyze_rules,
         ai_max_findings=args.ai_max_findings,
@@ -609,6 +673,7 @@ def main() -> int:
                 endpoint=args.upload,
                 api_key=api_key,
                 application_id=application_id,
+                streaming=args.upload_streaming,
             )
         else:
             logger.warning(
@@ -628,12 +693,15 @@ def main() -> int:
         logger.info("Step 7: Formatting output...")
         if args.format == "sarif":
             logger.debug("Using SARIF formatter")
-            formatter = SARIFFormatter()
+            formatter = SARIFFormatter(workers=config.jobs or os.cpu_count() or 1)
             if args.out:
                 # Use cwd as root so artifact URIs are relative to repo root (GitHub Code Scanning)
                 root_path = str(Path.cwd())
                 logger.info(f"Writing SARIF output to {args.out}")
-                formatter.write(result, args.out, root_path=root_path)
+                if args.stream_output:
+                    formatter.write_streaming(result, args.out, root_path=root_path)
+                else:
+                    formatter.write(result, args.out, root_path=root_path)
                 logger.info("✓ SARIF output written")
             else:
                 logger.error("--out is required for SARIF format")
@@ -654,8 +722,7 @@ def main() -> int:
         else:  # console
             logger.debug("Using console formatter")
             formatter = ConsoleFormatter()
-            output = formatter.format(result)
-            print(output)
+            formatter.write_to_stdout(result)
             if args.out:
                 logger.info(f"Writing console output to {args.out}")
                 formatter.write(result, args.out)
@@ -675,6 +742,9 @@ def main() -> int:
         logger.error(f"Scan failed with error: {e}", exc_info=True)
         print(f"Error: {e}", file=sys.stderr)
         return 1
+    finally:
+        if uploader is not None:
+            uploader.close()
 
 
 if __name__ == "__main__":
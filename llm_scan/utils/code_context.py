@@ -2,7 +2,7 @@
 
 import logging
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -42,31 +42,43 @@ def extract_code_context(
         with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
             lines = f.readlines()
 
-        # Calculate context range
-        start_line = max(0, line_number - context_lines - 1)
-        end_line = min(len(lines), line_number + context_lines)
-
-        # Extract context
-        context_lines_list = lines[start_line:end_line]
-        context = "".join(context_lines_list)
-
-        # Add line numbers for reference
-        numbered_context = []
-        for i, line in enumerate(context_lines_list, start=start_line + 1):
-            numbered_context.append(f"{i:4d} | {line}")
-
-        return "".join(numbered_context)
+        return format_code_context(lines, line_number, context_lines)
 
     except Exception as e:
         logger.error(f"Error extracting code context from {file_path}: {e}")
         return None
 
 
+def format_code_context(lines: List[str], line_number: int, context_lines: int = 50) -> str:
+    """
+    Format line-numbered code context from already loaded lines.
+
+    Args:
+        lines: File lines, including line endings
+        line_number: Line number of the finding
+        context_lines: Number of lines before/after to include
+
+    Returns:
+        Code context string with line numbers
+    """
+    # Calculate context range
+    start_line = max(0, line_number - context_lines - 1)
+    end_line = min(len(lines), line_number + context_lines)
+
+    # Add line numbers for reference
+    numbered_context = []
+    for i, line in enumerate(lines[start_line:end_line], start=start_line + 1):
+        numbered_context.append(f"{i:4d} | {line}")
+
+    return "".join(numbered_context)
+
+
 def extract_snippet_context(
     snippet: Optional[str],
     file_path: str,
     line_number: int,
     context_lines: int = 20,
+    lines: Optional[List[str]] = None,
 ) -> str:
     """
     Extract context around a code snippet.
@@ -76,11 +88,15 @@ def extract_snippet_context(
         file_path: Path to the source file
         line_number: Line number of the finding
         context_lines: Number of lines before/after to include
+        lines: Optional pre-loaded file lines (avoids re-reading the file)
 
     Returns:
         Combined snippet and context
     """
-    context = extract_code_context(file_path, line_number, context_lines)
+    if lines is not None:
+        context = format_code_context(lines, line_number, context_lines)
+    else:
+        context = extract_code_context(file_path, line_number, context_lines)
     if not context:
         return snippet or ""
 